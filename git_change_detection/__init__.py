@@ -0,0 +1,5 @@
+from git_change_detection.api import Detector, detect
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.detection import DetectionResult, TriggeredNode
+
+__all__ = ["DependencyGraph", "DetectionResult", "Detector", "TriggeredNode", "detect"]
@@ -0,0 +1,313 @@
+"""
+Python API for change detection, for long-lived processes embedding the tool.
+
+This module never imports the CLI dependencies (typer, rich).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.detection import DetectionResult, TriggeredNode
+from git_change_detection.models.node_metadata import MAX_CAUSES, NodeMetadata
+from git_change_detection.utils.git import get_changed_files
+from git_change_detection.utils.patterns import TriggerIndex
+
+# last commit reported by live detections, made against the working tree
+WORKING_TREE = "(working tree)"
+
+
+class Detector:
+    """
+    Runs detections against a dependency graph loaded once.
+
+    The graph, its compiled trigger index and dependency levels are reused by
+    every call. Detections never modify the graph, as each one marks triggers
+    on its own copy, and the index only updates its lazily compiled state
+    under a lock, so a detector can be called repeatedly, including from
+    several threads.
+
+    When a metadata file changes, ``reload_file`` patches the graph, index and
+    levels for the affected nodes only.
+    """
+
+    def __init__(self, graph: DependencyGraph) -> None:
+        self.graph = graph.copy()
+        self.index: TriggerIndex = self.graph.build_trigger_index()
+        self.levels = self._compute_levels()
+        self._untriggered: dict[str, NodeMetadata] | None = None
+
+    @classmethod
+    def from_files(cls, paths: list[Path]) -> Detector:
+        """Load and merge metadata files into a new detector."""
+        graph = DependencyGraph()
+        graph.load_files([Path(p) for p in paths])
+        return cls(graph)
+
+    def _compute_levels(self) -> dict[str, int] | None:
+        """Dependency levels of the graph, or None while it has a cycle."""
+        try:
+            return self.graph.dependency_levels()
+        except RuntimeError:
+            return None
+
+    def reload_file(self, path: Path) -> set[str]:
+        """
+        Re-read a metadata file and patch the detector for the nodes it affects.
+
+        Not thread-safe: do not reload while detections are running.
+
+        Returns:
+            Names of the nodes that may have changed, been added or removed.
+        """
+        return self._patch(self.graph.reload_file(Path(path)))
+
+    def replace_source(self, source: str, data: dict[str, Any]) -> set[str]:
+        """Replace the metadata contributed by a source, see ``reload_file``."""
+        return self._patch(self.graph.replace_source(source, data))
+
+    def retract_source(self, source: str) -> set[str]:
+        """Remove the metadata contributed by a source, see ``reload_file``."""
+        return self._patch(self.graph.retract_source(source))
+
+    def _patch(self, affected: set[str]) -> set[str]:
+        self._untriggered = None
+        for name in affected:
+            self.index.remove_node(name)
+            node = self.graph.nodes.get(name)
+            if node is not None and node.repository is None:
+                self.index.add_node(node)
+
+        if self.levels is None:
+            self.levels = self._compute_levels()
+        else:
+            try:
+                self.graph.update_dependency_levels(self.levels, affected)
+            except RuntimeError:
+                self.levels = None
+        return affected
+
+    def detect(
+        self,
+        first_commit: str,
+        last_commit: str,
+        repo: Path | None = None,
+        submodules: bool = False,
+        max_causes: int | None = MAX_CAUSES,
+    ) -> DetectionResult:
+        """
+        Detect changed files between two commits and resolve the triggered nodes.
+
+        Stages are only computed when the graph has no dependency cycle, and at
+        most ``max_causes`` files are listed per node (all of them when None).
+
+        Raises:
+            RuntimeError: If the repository or one of the commits cannot be found.
+        """
+        changed_files = get_changed_files(first_commit, last_commit, repo, submodules)
+        return self.detect_files(first_commit, last_commit, changed_files, max_causes)
+
+    def detect_files(
+        self,
+        first_commit: str,
+        last_commit: str,
+        changed_files: list[str],
+        max_causes: int | None = MAX_CAUSES,
+    ) -> DetectionResult:
+        """Resolve the triggered nodes for an already known list of changed files."""
+        graph, cycles, stages = self.resolve(self.index.match(changed_files), max_causes)
+        return _result(first_commit, last_commit, changed_files, graph, cycles, stages)
+
+    def resolve(
+        self, matches: Iterable[tuple[str, str, str]], max_causes: int | None = MAX_CAUSES
+    ) -> tuple[DependencyGraph, list[list[str]], list[list[str]]]:
+        """
+        Mark the (file, node, pattern) trigger matches on a copy of the graph.
+
+        The marked graph lists every node, with its dependencies on missing
+        nodes dropped. Only the triggered nodes are copied: the others are
+        shared with the detector and must not be modified. When the graph has
+        a cycle, cycles are reported from a full copy instead.
+
+        Returns:
+            The marked graph, its dependency cycles and its triggered stages.
+        """
+        if self.levels is None:
+            graph = self.graph.copy()
+            graph.sanitize_dependencies()
+            for file, node_name, pattern in matches:
+                graph.mark_triggered(node_name, file, pattern, max_causes)
+            return graph, graph.detect_cycles(), []
+
+        nodes = self.graph.nodes
+        triggered: dict[str, NodeMetadata] = {}
+        for file, node_name, pattern in matches:
+            node = triggered.get(node_name)
+            if node is None:
+                node = triggered[node_name] = self._fresh_copy(nodes[node_name])
+            node.mark_triggered(file, pattern, max_causes)
+
+        graph = DependencyGraph()
+        graph.blacklist = set(self.graph.blacklist)
+        # triggered nodes replace their untriggered view, in the order of the full graph
+        graph.nodes = dict(self._untriggered_nodes())
+        graph.nodes.update(triggered)
+        return graph, [], graph.stages_from_levels(self.levels)
+
+    def _untriggered_nodes(self) -> dict[str, NodeMetadata]:
+        """
+        The nodes of the graph as reported when not triggered, rebuilt after
+        each patch: nodes depending on missing nodes are copied, the others
+        are shared with the graph.
+        """
+        untriggered = self._untriggered
+        if untriggered is None:
+            nodes = self.graph.nodes
+            untriggered = self._untriggered = {
+                name: node
+                if all(dep in nodes for dep in node.depends_on)
+                else self._fresh_copy(node)
+                for name, node in nodes.items()
+            }
+        return untriggered
+
+    def _fresh_copy(self, node: NodeMetadata) -> NodeMetadata:
+        """Copy a node of the graph, with no causes and no dependency on missing nodes."""
+        nodes = self.graph.nodes
+        return node.model_copy(
+            update={
+                "depends_on": [dep for dep in node.depends_on if dep in nodes],
+                "triggered_by": [],
+                "match_counts": {},
+            }
+        )
+
+
+class LiveDetection:
+    """
+    Triggered nodes kept up to date while the changed files evolve.
+
+    Only the paths reported by ``update`` are matched against the triggers; the
+    matches of every other changed path are kept from previous updates.
+    """
+
+    def __init__(self, detector: Detector, base_commit: str, changed_files: Iterable[str] = ()):
+        self.detector = detector
+        self.base_commit = base_commit
+        self.matches: dict[str, list[tuple[str, str]]] = {}
+        self.update(changed_files)
+
+    @property
+    def changed_files(self) -> list[str]:
+        return sorted(self.matches)
+
+    def update(self, changed: Iterable[str] = (), reverted: Iterable[str] = ()) -> None:
+        """
+        Record newly changed paths and paths back to their base content.
+
+        Args:
+            changed: Paths differing from the base commit.
+            reverted: Paths no longer differing from the base commit.
+        """
+        for path in reverted:
+            self.matches.pop(path, None)
+        changed = [path for path in changed if path not in self.matches]
+        for path in changed:
+            self.matches[path] = []
+        for path, node, pattern in self.detector.index.match(changed):
+            self.matches[path].append((node, pattern))
+
+    def rematch(self) -> None:
+        """Match every changed path again, after the detector was reloaded."""
+        paths = list(self.matches)
+        self.matches.clear()
+        self.update(paths)
+
+    def resolve(
+        self, max_causes: int | None = MAX_CAUSES
+    ) -> tuple[DependencyGraph, list[list[str]], list[list[str]]]:
+        """Return the marked graph, its dependency cycles and its triggered stages."""
+        matches = (
+            (path, node, pattern)
+            for path in self.changed_files
+            for node, pattern in self.matches[path]
+        )
+        return self.detector.resolve(matches, max_causes)
+
+    def result(self, max_causes: int | None = MAX_CAUSES) -> DetectionResult:
+        """Return the current detection against the working tree."""
+        graph, cycles, stages = self.resolve(max_causes)
+        return _result(self.base_commit, WORKING_TREE, self.changed_files, graph, cycles, stages)
+
+
+def _result(
+    first_commit: str,
+    last_commit: str,
+    changed_files: list[str],
+    graph: DependencyGraph,
+    cycles: list[list[str]],
+    stages: list[list[str]],
+) -> DetectionResult:
+    triggered = {
+        name: TriggeredNode(
+            name=name,
+            depends_on=list(node.depends_on),
+            stage=node.stage,
+            triggered_by=node.triggered_by,
+            match_counts=node.match_counts,
+            matched_files=node.matched_files,
+            deploy_reason=node.deploy_reason,
+            fingerprint=node.fingerprint,
+        )
+        for name, node in graph.nodes.items()
+        if node.triggered
+    }
+    return DetectionResult(
+        first_commit=first_commit,
+        last_commit=last_commit,
+        changed_files=changed_files,
+        triggered=triggered,
+        stages=stages,
+        cycles=cycles,
+    )
+
+
+def detect(
+    repo: Path | str | None,
+    first_commit: str,
+    last_commit: str,
+    metadata: list[Path | str] | None = None,
+    graph: DependencyGraph | None = None,
+    submodules: bool = False,
+    max_causes: int | None = MAX_CAUSES,
+) -> DetectionResult:
+    """
+    Detect changed files between two commits and resolve the triggered nodes.
+
+    For repeated detections against the same metadata, create a ``Detector``
+    once instead, which also reuses the compiled trigger patterns.
+
+    Args:
+        repo: Path to the repository (defaults to current working dir).
+        first_commit: The base commit (older).
+        last_commit: The target commit (newer).
+        metadata: Metadata files to load, when no graph is given.
+        graph: A dependency graph loaded beforehand, reused without being modified.
+        submodules: Also report files changed inside updated submodules.
+        max_causes: Maximum number of files listed per triggered node, None for all.
+
+    Returns:
+        The changed files, triggered nodes with their causes, stages and cycles.
+    """
+    if graph is None:
+        if not metadata:
+            raise ValueError("Either metadata files or a dependency graph is required.")
+        detector = Detector.from_files([Path(p) for p in metadata])
+    else:
+        detector = Detector(graph)
+    return detector.detect(
+        first_commit, last_commit, Path(repo) if repo else None, submodules, max_causes
+    )
@@ -1,57 +1,640 @@
-import fnmatch
-import os
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, Literal
 
 import typer
 import yaml
 from jsonschema import ValidationError, validate
 
+from git_change_detection.api import Detector, LiveDetection
 from git_change_detection.models.dependency_graph import DependencyGraph
-from git_change_detection.utils.git import get_changed_files
-from git_change_detection.utils.io import load_metadata_file, load_schema
-from git_change_detection.utils.output import render_output
+from git_change_detection.models.node_metadata import MAX_CAUSES
+from git_change_detection.utils.compiled import CompiledMetadata, compile_graph
+from git_change_detection.utils.executor import execute_triggered
+from git_change_detection.utils.fingerprint import EMPTY_FINGERPRINT, Fingerprinter
+from git_change_detection.utils.git import (
+    get_changed_files,
+    get_changed_files_many,
+    get_commit,
+    resolve_merge_base,
+)
+from git_change_detection.utils.io import (
+    load_deployed,
+    load_durations,
+    load_metadata_file,
+    load_schema,
+    record_deployed,
+)
+from git_change_detection.utils.output import (
+    render_execution,
+    render_output,
+    render_pipeline,
+    render_schedule,
+)
+from git_change_detection.utils.patterns import TriggerIndex
+from git_change_detection.utils.profiling import NULL_PROFILER, NullProfiler, Profiler, profiling
+from git_change_detection.utils.watch import WorktreeChanges, open_watcher
 
 app = typer.Typer(help="GitCD: dependency-aware change detection for Git.")
 
+ProfileOption = Annotated[
+    Path | None,
+    typer.Option("--profile", help="Write per-phase timings and counters to this file"),
+]
+RepositoryOption = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--repository",
+        "-r",
+        help="Additional repository as NAME=PATH, for nodes declaring 'repository: NAME'",
+    ),
+]
+RangeOption = Annotated[
+    list[str] | None,
+    typer.Option("--range", help="Commit range of an additional repository as NAME=FIRST..LAST"),
+]
+StateOption = Annotated[
+    Path | None,
+    typer.Option("--state", help="SQLite file recording the last deployed fingerprint per node"),
+]
+ProfileFormatOption = Annotated[
+    Literal["json", "trace"],
+    typer.Option("--profile-format", help="Profile as a JSON report or a Chrome trace"),
+]
+
 
 @app.command()
 def detect(
+    metadata_files: Annotated[
+        list[Path] | None,
+        typer.Option("--metadata", "-m", help="Metadata files to load", exists=True),
+    ] = None,
+    first_commit: Annotated[
+        str | None,
+        typer.Argument(help="First commit in diff (omitted with --merge-base or --state)"),
+    ] = None,
+    last_commit: Annotated[
+        str | None,
+        typer.Argument(help="Last commit in diff (HEAD by default with --merge-base or --state)"),
+    ] = None,
+    json_output: Annotated[
+        bool, typer.Option("--json", help="Output results as JSON, same as --format json")
+    ] = False,
+    output_format: Annotated[
+        Literal["table", "plain", "json", "gitlab"] | None,
+        typer.Option(
+            "--format",
+            help="Output format (table by default), plain text is fastest for large results, "
+            "gitlab is a child pipeline running triggered nodes as a DAG",
+        ),
+    ] = None,
+    summary: Annotated[
+        bool,
+        typer.Option("--summary", help="Only show counts and the first files of each node"),
+    ] = False,
+    max_rows: Annotated[
+        int | None,
+        typer.Option("--max-rows", min=0, help="Maximum number of triggered nodes listed"),
+    ] = None,
+    max_files: Annotated[
+        int | None,
+        typer.Option("--max-files", min=0, help="Maximum number of files listed, per section"),
+    ] = None,
+    all_causes: Annotated[
+        bool,
+        typer.Option(
+            "--all-causes",
+            help=f"Record every matched file and pattern, not only {MAX_CAUSES} files per node",
+        ),
+    ] = False,
+    repo: Annotated[Path | None, typer.Option("--repo", help="Path to Git repository")] = None,
+    submodules: Annotated[
+        bool,
+        typer.Option("--submodules", help="Report files changed inside updated submodules"),
+    ] = False,
+    repositories: RepositoryOption = None,
+    ranges: RangeOption = None,
+    merge_base: Annotated[
+        str | None,
+        typer.Option(
+            "--merge-base", help="Diff from the merge base of this reference and the last commit"
+        ),
+    ] = None,
+    remote: Annotated[
+        str, typer.Option("--remote", help="Remote used to fetch history missing from the clone")
+    ] = "origin",
+    deepen: Annotated[
+        int,
+        typer.Option(
+            "--deepen", min=1, help="Commits fetched by the first deepening, doubled after"
+        ),
+    ] = 32,
+    job_template: Annotated[
+        str,
+        typer.Option("--job-template", help="Job extended by every job of a gitlab pipeline"),
+    ] = ".gcd-node",
+    includes: Annotated[
+        list[str] | None,
+        typer.Option("--include", help="Local file included by a gitlab pipeline"),
+    ] = None,
+    state: StateOption = None,
+    compiled: Annotated[
+        Path | None,
+        typer.Option(
+            "--compiled", help="Metadata artifact built by the compile command", exists=True
+        ),
+    ] = None,
+    profile: ProfileOption = None,
+    profile_format: ProfileFormatOption = "json",
+):
+    """
+    Detect changed files and resolve triggered nodes in the dependency graph.
+
+    With --state, nodes are triggered when their inputs differ from their last
+    deployment instead of being changed within a commit range.
+    """
+    if bool(metadata_files) == bool(compiled):
+        raise typer.BadParameter("either --metadata or --compiled is required")
+    metadata_files = metadata_files or []
+    commits = [c for c in (first_commit, last_commit) if c]
+    if merge_base and state:
+        raise typer.BadParameter("--merge-base and --state cannot be combined")
+    if (merge_base or state) and len(commits) > 1:
+        raise typer.BadParameter("only the last commit can be given with --merge-base or --state")
+    if not (merge_base or state) and len(commits) != 2:
+        raise typer.BadParameter(
+            "FIRST_COMMIT and LAST_COMMIT are required without --merge-base or --state"
+        )
+    if json_output and output_format not in (None, "json"):
+        raise typer.BadParameter(f"--json cannot be combined with --format {output_format}")
+    extra_repos = _parse_repositories(repositories, ranges)
+    if state and extra_repos:
+        raise typer.BadParameter("--state only covers the nodes of the main repository")
+
+    with profiling(profile, profile_format) as profiler:
+        if state:
+            commit = commits[0] if commits else "HEAD"
+            graph = _detect_undeployed(commit, metadata_files, repo, state, profiler, compiled)
+            changed_files: list[str] = []
+        else:
+            if merge_base:
+                last_commit = commits[0] if commits else "HEAD"
+                try:
+                    with profiler.phase("merge_base"):
+                        first_commit = resolve_merge_base(
+                            merge_base, last_commit, repo, remote, deepen
+                        )
+                except RuntimeError as e:
+                    typer.echo(f"Error: {e}")
+                    raise typer.Exit(code=1)
+
+            graph, changed_files = _detect_changes(
+                first_commit,
+                last_commit,
+                metadata_files,
+                repo,
+                profiler,
+                submodules,
+                extra_repos,
+                None if all_causes else MAX_CAUSES,
+                compiled,
+            )
+
+        with profiler.phase("detect_cycles"):
+            cycles = graph.detect_cycles()
+        fmt = output_format or ("json" if json_output else "table")
+        if fmt == "gitlab":
+            if cycles:
+                described = "; ".join(" → ".join(cycle) for cycle in cycles)
+                typer.echo(f"Error: dependency cycles detected: {described}")
+                raise typer.Exit(code=1)
+            with profiler.phase("render"):
+                render_pipeline(graph, job_template, includes)
+            return
+
+        with profiler.phase("build_stages"):
+            stages = graph.build_triggered_stages()
+
+        with profiler.phase("render"):
+            render_output(graph, changed_files, cycles, stages, fmt, summary, max_rows, max_files)
+
+
+@app.command()
+def schedule(
     first_commit: Annotated[str, typer.Argument(help="First commit in diff")],
     last_commit: Annotated[str, typer.Argument(help="Last commit in diff")],
     metadata_files: Annotated[
         list[Path],
         typer.Option(..., "--metadata", "-m", help="Metadata files to load", exists=True),
     ],
+    durations_file: Annotated[
+        Path | None,
+        typer.Option(
+            "--durations", "-d", help="Historical node durations (JSON or SQLite)", exists=True
+        ),
+    ] = None,
+    max_parallel: Annotated[
+        int | None,
+        typer.Option("--max-parallel", min=1, help="Maximum number of nodes running at once"),
+    ] = None,
+    default_duration: Annotated[
+        float,
+        typer.Option("--default-duration", min=0, help="Seconds assumed for nodes without history"),
+    ] = 60.0,
     json_output: Annotated[bool, typer.Option("--json", help="Output results as JSON")] = False,
     repo: Annotated[Path | None, typer.Option("--repo", help="Path to Git repository")] = None,
 ):
     """
-    Detect changed files and resolve triggered nodes in the dependency graph.
+    Plan triggered nodes by critical path, minimising the total deployment time.
+    """
+    graph, _ = _detect_changes(first_commit, last_commit, metadata_files, repo)
+
+    try:
+        durations = load_durations(durations_file) if durations_file else {}
+        plan = graph.build_triggered_schedule(durations, max_parallel, default_duration)
+    except (OSError, ValueError, RuntimeError) as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    fmt = "json" if json_output else "table"
+    render_schedule(plan, fmt)
+
+
+@app.command()
+def execute(
+    first_commit: Annotated[str, typer.Argument(help="First commit in diff")],
+    last_commit: Annotated[str, typer.Argument(help="Last commit in diff")],
+    metadata_files: Annotated[
+        list[Path],
+        typer.Option(..., "--metadata", "-m", help="Metadata files to load", exists=True),
+    ],
+    command: Annotated[
+        str,
+        typer.Option(
+            ..., "--command", "-c", help="Shell command to run per node, {node} is the node name"
+        ),
+    ],
+    max_parallel: Annotated[
+        int | None,
+        typer.Option("--max-parallel", min=1, help="Maximum number of nodes running at once"),
+    ] = None,
+    fail_fast: Annotated[
+        bool,
+        typer.Option(
+            "--fail-fast/--continue-on-error",
+            help="Cancel everything on the first failure, or keep running independent nodes",
+        ),
+    ] = False,
+    json_output: Annotated[bool, typer.Option("--json", help="Output results as JSON")] = False,
+    repo: Annotated[Path | None, typer.Option("--repo", help="Path to Git repository")] = None,
+    state: StateOption = None,
+):
+    """
+    Run a command for every triggered node, as soon as its dependencies succeeded.
+
+    With --state, the nodes that succeeded are recorded as deployed at the last commit.
+    """
+    graph, _ = _detect_changes(first_commit, last_commit, metadata_files, repo)
+
+    def log(node: str, line: str) -> None:
+        typer.echo(f"[{node}] {line}", err=True)
+
+    try:
+        report = execute_triggered(
+            graph, command, max_parallel, fail_fast, str(repo or Path.cwd()), log
+        )
+    except (OSError, RuntimeError) as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    if state:
+        succeeded = {run.name for run in report.runs if run.status == "success"}
+        _record(last_commit, graph, repo, state, succeeded)
+
+    fmt = "json" if json_output else "table"
+    render_execution(report, fmt)
+    if not report.succeeded:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def record(
+    metadata_files: Annotated[
+        list[Path],
+        typer.Option(..., "--metadata", "-m", help="Metadata files to load", exists=True),
+    ],
+    state: Annotated[
+        Path,
+        typer.Option(..., "--state", help="SQLite file recording the last deployed fingerprints"),
+    ],
+    commit: Annotated[str, typer.Argument(help="Deployed commit")] = "HEAD",
+    nodes: Annotated[
+        list[str] | None,
+        typer.Option("--node", "-n", help="Deployed node (all nodes by default)"),
+    ] = None,
+    repo: Annotated[Path | None, typer.Option("--repo", help="Path to Git repository")] = None,
+):
+    """
+    Record nodes as successfully deployed at a commit, for detect --state.
     """
-    repo = repo or Path.cwd()
     graph = DependencyGraph()
-    graph.load_files(metadata_files)
-    graph.sanitize_dependencies()
+    try:
+        graph.load_files(metadata_files)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    unknown = sorted(set(nodes or []) - set(graph.nodes))
+    if unknown:
+        raise typer.BadParameter(f"unknown nodes: {', '.join(unknown)}")
+
+    recorded = _record(commit, graph, repo, state, set(nodes) if nodes else None)
+    typer.echo(f"Recorded {recorded} deployed nodes at {commit}.")
+
+
+@app.command()
+def watch(
+    metadata_files: Annotated[
+        list[Path],
+        typer.Option(..., "--metadata", "-m", help="Metadata files to load", exists=True),
+    ],
+    base_commit: Annotated[str, typer.Argument(help="Commit the working tree is compared to")] = (
+        "HEAD"
+    ),
+    output_format: Annotated[
+        Literal["table", "plain", "json"],
+        typer.Option("--format", help="Output format, re-rendered on every change"),
+    ] = "table",
+    summary: Annotated[
+        bool,
+        typer.Option("--summary", help="Only show counts and the first files of each node"),
+    ] = False,
+    max_rows: Annotated[
+        int | None,
+        typer.Option("--max-rows", min=0, help="Maximum number of triggered nodes listed"),
+    ] = None,
+    max_files: Annotated[
+        int | None,
+        typer.Option("--max-files", min=0, help="Maximum number of files listed, per section"),
+    ] = None,
+    repo: Annotated[Path | None, typer.Option("--repo", help="Path to Git repository")] = None,
+    polling: Annotated[
+        bool, typer.Option("--polling", help="Poll file stats instead of using inotify")
+    ] = False,
+):
+    """
+    Keep the triggered nodes and stages of the working tree up to date while editing.
+    """
+    try:
+        detector = Detector.from_files(metadata_files)
+        changes = WorktreeChanges(base_commit, repo)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    live = LiveDetection(detector, base_commit, changes.changed)
+    metadata = {path.resolve(): path for path in metadata_files}
+
+    def show() -> None:
+        graph, cycles, stages = live.resolve()
+        render_output(
+            graph, live.changed_files, cycles, stages, output_format, summary, max_rows, max_files
+        )
+
+    show()
+    watcher = open_watcher(changes.root, polling)
+    try:
+        while True:
+            paths = watcher.read()
+            if paths is None:
+                added, removed = changes.rescan()
+                paths = set()
+            elif paths:
+                added, removed = changes.refresh(paths)
+            else:
+                continue
+
+            reloaded = False
+            for path in paths:
+                source = metadata.get((changes.root / path).resolve())
+                if source is None:
+                    continue
+                try:
+                    detector.reload_file(source)
+                    reloaded = True
+                except (OSError, ValueError, yaml.YAMLError) as e:
+                    typer.echo(f"Error: {source}: {e}", err=True)
+            if reloaded:
+                live.rematch()
+
+            if added or removed or reloaded:
+                live.update(added, removed)
+                show()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _detect_changes(
+    first_commit: str,
+    last_commit: str,
+    metadata_files: list[Path],
+    repo: Path | None,
+    profiler: Profiler | NullProfiler = NULL_PROFILER,
+    submodules: bool = False,
+    extra_repos: dict[str, tuple[str, str, Path]] | None = None,
+    max_causes: int | None = MAX_CAUSES,
+    compiled: Path | None = None,
+) -> tuple[DependencyGraph, list[str]]:
+    """
+    Load the dependency graph and mark nodes triggered by the commit range.
+
+    Additional named repositories are diffed concurrently with the main one;
+    their changed files are reported as ``<name>:<file>``. Repositories of the
+    metadata that are not diffed are reported on stderr, as their nodes can
+    never be triggered.
+    """
+    repo = repo or Path.cwd()
+    graph, main_index = _load_graph(metadata_files, compiled, profiler)
+    missing = {n.repository for n in graph.nodes.values() if n.repository} - set(extra_repos or {})
+    if missing:
+        typer.echo(
+            f"Warning: no --repository given for {', '.join(sorted(missing))}, "
+            "their nodes are never triggered",
+            err=True,
+        )
 
     try:
-        changed_files = get_changed_files(first_commit, last_commit, repo)
+        with profiler.phase("git_diff"):
+            if extra_repos:
+                changes = get_changed_files_many(
+                    {None: (first_commit, last_commit, repo), **extra_repos}, submodules
+                )
+            else:
+                changes = {None: get_changed_files(first_commit, last_commit, repo, submodules)}
     except RuntimeError as e:
         typer.echo(f"Error: {e}")
         raise typer.Exit(code=1)
 
-    for file in changed_files:
-        for node in graph.nodes.values():
-            for prefix, patterns in node.triggers.items():
-                for pattern in patterns:
-                    if fnmatch.fnmatch(file, os.path.join(prefix, pattern)):
-                        node.mark_triggered(file, os.path.join(prefix, pattern))
+    evaluations = 0
+    with profiler.phase("match_triggers"):
+        for name, files in changes.items():
+            index = main_index if name is None else graph.build_trigger_index(name)
+            graph.match_triggers(files, index, name, max_causes)
+            evaluations += index.evaluations
+    changed_files = [f"{name}:{f}" if name else f for name, files in changes.items() for f in files]
 
-    cycles = graph.detect_cycles()
-    stages = graph.build_triggered_stages()
+    if profiler.enabled:
+        profiler.count("files_parsed", len(metadata_files))
+        profiler.count("nodes", len(graph.nodes))
+        profiler.count("patterns", graph.count_patterns())
+        profiler.count("changed_files", len(changed_files))
+        profiler.count("pattern_evaluations", evaluations)
+        profiler.count("matches", sum(sum(n.match_counts.values()) for n in graph.nodes.values()))
+        profiler.count("triggered_nodes", sum(n.triggered for n in graph.nodes.values()))
+    return graph, changed_files
 
-    fmt = "json" if json_output else "table"
-    render_output(graph, changed_files, cycles, stages, fmt)
+
+def _load_graph(
+    metadata_files: list[Path],
+    compiled: Path | None = None,
+    profiler: Profiler | NullProfiler = NULL_PROFILER,
+) -> tuple[DependencyGraph, TriggerIndex]:
+    """Load the dependency graph and the trigger index of the main repository nodes."""
+    with profiler.phase("load_metadata"):
+        if compiled:
+            try:
+                artifact = CompiledMetadata(compiled)
+            except (OSError, ValueError) as e:
+                typer.echo(f"Error: {e}")
+                raise typer.Exit(code=1)
+            return artifact.graph(), artifact.trigger_index()
+        graph = DependencyGraph()
+        try:
+            graph.load_files(metadata_files)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            typer.echo(f"Error: {e}")
+            raise typer.Exit(code=1)
+        graph.sanitize_dependencies()
+    return graph, graph.build_trigger_index()
+
+
+def _fingerprint(
+    commit: str,
+    graph: DependencyGraph,
+    repo: Path | None,
+    profiler: Profiler | NullProfiler = NULL_PROFILER,
+    index: TriggerIndex | None = None,
+) -> tuple[str, dict[str, str]]:
+    """Return the resolved commit and the input fingerprints of the main repository nodes."""
+    try:
+        resolved = get_commit(commit, repo)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    fingerprinter = Fingerprinter(index or graph.build_trigger_index())
+    with profiler.phase("fingerprint"):
+        fingerprints = fingerprinter.fingerprints(resolved.tree)
+    profiler.count("trees_walked", fingerprinter.trees_walked)
+    return resolved.hexsha, fingerprints
+
+
+def _detect_undeployed(
+    commit: str,
+    metadata_files: list[Path],
+    repo: Path | None,
+    state: Path,
+    profiler: Profiler | NullProfiler = NULL_PROFILER,
+    compiled: Path | None = None,
+) -> DependencyGraph:
+    """Load the dependency graph and mark nodes whose inputs differ from their last deployment."""
+    graph, index = _load_graph(metadata_files, compiled, profiler)
+    _, fingerprints = _fingerprint(commit, graph, repo, profiler, index)
+    try:
+        deployed = load_deployed(state)
+    except ValueError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    graph.match_fingerprints(fingerprints, deployed)
+
+    if profiler.enabled:
+        profiler.count("files_parsed", len(metadata_files))
+        profiler.count("nodes", len(graph.nodes))
+        profiler.count("triggered_nodes", sum(n.triggered for n in graph.nodes.values()))
+    return graph
+
+
+def _record(
+    commit: str,
+    graph: DependencyGraph,
+    repo: Path | None,
+    state: Path,
+    nodes: set[str] | None = None,
+) -> int:
+    """Record the current fingerprints of nodes (all main repository nodes by default)."""
+    resolved, fingerprints = _fingerprint(commit, graph, repo)
+    deployed = {
+        name: fingerprints.get(name, EMPTY_FINGERPRINT)
+        for name, node in graph.nodes.items()
+        if node.repository is None and (nodes is None or name in nodes)
+    }
+    try:
+        record_deployed(state, deployed, resolved)
+    except ValueError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    return len(deployed)
+
+
+def _parse_repositories(
+    repositories: list[str] | None, ranges: list[str] | None
+) -> dict[str, tuple[str, str, Path]]:
+    """Pair ``NAME=PATH`` repositories with their ``NAME=FIRST..LAST`` commit ranges."""
+    paths = {}
+    for value in repositories or []:
+        name, sep, path = value.partition("=")
+        if not sep or not name or not path:
+            raise typer.BadParameter(
+                f"expected NAME=PATH, got '{value}'", param_hint="--repository"
+            )
+        paths[name] = Path(path)
+
+    commits = {}
+    for value in ranges or []:
+        name, sep, commit_range = value.partition("=")
+        first, dots, last = commit_range.partition("..")
+        if not sep or not name or not dots or not first or not last:
+            raise typer.BadParameter(
+                f"expected NAME=FIRST..LAST, got '{value}'", param_hint="--range"
+            )
+        commits[name] = (first, last)
+
+    if paths.keys() != commits.keys():
+        unpaired = sorted(paths.keys() ^ commits.keys())
+        raise typer.BadParameter(
+            f"every repository needs both a path and a range, unpaired: {', '.join(unpaired)}",
+            param_hint="--repository/--range",
+        )
+    return {name: (*commits[name], paths[name]) for name in paths}
+
+
+@app.command(name="compile")
+def compile_cmd(
+    metadata_files: Annotated[
+        list[Path],
+        typer.Option(..., "--metadata", "-m", help="Metadata files to compile", exists=True),
+    ],
+    output: Annotated[Path, typer.Option(..., "--output", "-o", help="Artifact to write")],
+):
+    """
+    Validate metadata files and compile them into an artifact for detect --compiled.
+    """
+    graph = _validate(metadata_files, NULL_PROFILER)
+    try:
+        compile_graph(graph, output)
+    except OSError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Compiled {len(graph.nodes)} nodes into {output}")
 
 
 @app.command(name="validate")
@@ -60,40 +643,66 @@ def validate_cmd(
         list[Path],
         typer.Option(..., "--metadata", "-m", help="Metadata files to validate", exists=True),
     ],
+    profile: ProfileOption = None,
+    profile_format: ProfileFormatOption = "json",
 ):
     """
     Validate metadata files for schema compliance, missing dependencies, and cycles.
     """
+    with profiling(profile, profile_format) as profiler:
+        _validate(metadata_files, profiler)
+
+
+def _validate(metadata_files: list[Path], profiler: Profiler | NullProfiler) -> DependencyGraph:
+    """
+    Run the validate command checks, exiting with code 1 on any error, and
+    return the graph they were run on. Every file is loaded once.
+    """
     schema = load_schema()
     has_errors = False
+    loaded: list[tuple[Path, dict[str, Any]]] = []
 
-    for path in metadata_files:
-        try:
-            data = load_metadata_file(path)
-            validate(instance=data, schema=schema)
-            typer.echo(f"✓ {path}: schema valid")
-        except ValidationError as e:
-            typer.echo(f"✗ {path}: schema error - {e.message}")
-            has_errors = True
-        except (OSError, ValueError, yaml.YAMLError) as e:
-            typer.echo(f"✗ {path}: failed to load - {e}")
-            has_errors = True
+    with profiler.phase("schema_validation"):
+        for path in metadata_files:
+            try:
+                data = load_metadata_file(path)
+                loaded.append((path, data))
+                validate(instance=data, schema=schema)
+                typer.echo(f"✓ {path}: schema valid")
+            except ValidationError as e:
+                typer.echo(f"✗ {path}: schema error - {e.message}")
+                has_errors = True
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                typer.echo(f"✗ {path}: failed to load - {e}")
+                has_errors = True
+
+    if len(loaded) < len(metadata_files):
+        raise typer.Exit(code=1)
 
     graph = DependencyGraph()
     try:
-        graph.load_files(metadata_files)
-    except (OSError, ValueError, yaml.YAMLError) as e:
+        with profiler.phase("build_graph"):
+            for path, data in loaded:
+                graph.deep_merge(data, source=str(path))
+    except ValueError as e:
         typer.echo(f"✗ Failed to build graph: {e}")
         raise typer.Exit(code=1)
 
-    missing = graph.find_missing_dependencies()
+    if profiler.enabled:
+        profiler.count("files_parsed", len(metadata_files))
+        profiler.count("nodes", len(graph.nodes))
+        profiler.count("patterns", graph.count_patterns())
+
+    with profiler.phase("missing_dependencies"):
+        missing = graph.find_missing_dependencies()
     if missing:
         has_errors = True
         typer.echo("\n✗ Missing dependencies:")
         for node, deps in missing.items():
             typer.echo(f"  {node} depends on non-existent: {', '.join(deps)}")
 
-    cycles = graph.detect_cycles()
+    with profiler.phase("detect_cycles"):
+        cycles = graph.detect_cycles()
     if cycles:
         has_errors = True
         typer.echo("\n✗ Dependency cycles detected:")
@@ -104,3 +713,4 @@ def validate_cmd(
         raise typer.Exit(code=1)
 
     typer.echo("\n✓ All validations passed")
+    return graph
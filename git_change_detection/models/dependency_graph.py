@@ -4,17 +4,74 @@ from pathlib import Path
 from typing import Any
 
 from git_change_detection.models.node_metadata import (
+    MAX_CAUSES,
     NodeMetadata,
 )
+from git_change_detection.models.schedule import Schedule, ScheduledNode
+from git_change_detection.utils.fingerprint import EMPTY_FINGERPRINT
 from git_change_detection.utils.io import load_metadata_file
+from git_change_detection.utils.patterns import TriggerIndex
+from git_change_detection.utils.scheduling import (
+    critical_path,
+    list_schedule,
+    staged_makespan,
+    topological_order,
+)
+
+# top-level metadata keys applying to every node defined in the same file
+FILE_DEFAULTS = ("pattern_syntax", "repository")
+# top-level metadata keys that do not define nodes
+RESERVED_KEYS = {"blacklist", *FILE_DEFAULTS}
+
+
+def _node_details(data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Return the node definitions of parsed metadata, with the file defaults applied."""
+    defaults = {key: data[key] for key in FILE_DEFAULTS if data.get(key)}
+    return {
+        name: {**defaults, **{k: v for k, v in (details or {}).items() if v is not None}}
+        for name, details in data.items()
+        if name not in RESERVED_KEYS
+    }
+
+
+def _check_repository(name: str, repository: str | None, details: dict[str, Any]) -> None:
+    """
+    Reject details defining a node for another repository than a previous
+    definition; node names are shared by every repository. A definition
+    without a repository inherits the other one.
+    """
+    other = details.get("repository")
+    if repository and other and other != repository:
+        raise ValueError(
+            f"Node '{name}' is defined for repository '{repository}' and for repository "
+            f"'{other}': node names must be unique across repositories"
+        )
 
 
 class DependencyGraph:
-    """Represents the full dependency graph of nodes."""
+    """
+    Represents the full dependency graph of nodes.
+
+    The metadata merged from every source (usually a file path) is recorded, so
+    that the contributions of a single source can later be retracted or
+    replaced without rebuilding the whole graph.
+    """
 
     def __init__(self) -> None:
         self.nodes: dict[str, NodeMetadata] = {}
         self.blacklist: set[str] = set()
+        self.sources: dict[str, dict[str, Any]] = {}
+        # node definitions of each source, with the file defaults applied
+        self._source_details: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def copy(self) -> DependencyGraph:
+        """Return an independent copy of the graph and its nodes."""
+        graph = DependencyGraph()
+        graph.nodes = {name: node.model_copy(deep=True) for name, node in self.nodes.items()}
+        graph.blacklist = set(self.blacklist)
+        graph.sources = dict(self.sources)
+        graph._source_details = dict(self._source_details)
+        return graph
 
     def remove_node(self, name: str) -> None:
         """Remove a node and clean up references."""
@@ -24,14 +81,33 @@ class DependencyGraph:
             if name in node.depends_on:
                 node.depends_on.remove(name)
 
-    def deep_merge(self, new_data: dict[str, Any]) -> None:
-        """Merge new metadata (parsed from YAML/JSON) into the graph."""
+    def deep_merge(self, new_data: dict[str, Any], source: str | None = None) -> None:
+        """
+        Merge new metadata (parsed from YAML/JSON) into the graph.
+
+        Args:
+            new_data: Parsed metadata.
+            source: Where the metadata comes from. Merging a source again
+                replaces its previous contributions.
+
+        Raises:
+            ValueError: If a node is already defined for another repository.
+        """
+        if source in self.sources:
+            self.replace_source(source, new_data)
+            return
         blacklisted = new_data.get("blacklist", [])
+        new_details = _node_details(new_data)
+        for node_name, details in new_details.items():
+            if node_name in self.nodes and node_name not in blacklisted:
+                _check_repository(node_name, self.nodes[node_name].repository, details)
+        source = source or f"<merge {len(self.sources)}>"
+        self.sources[source] = new_data
+        self._source_details[source] = new_details
+
         self.blacklist.update(blacklisted)
 
-        for node_name, details in new_data.items():
-            if node_name == "blacklist":
-                continue
+        for node_name, details in new_details.items():
             node = self.nodes.setdefault(node_name, NodeMetadata(name=node_name))
             node.merge(details)
 
@@ -42,12 +118,149 @@ class DependencyGraph:
         """Load multiple metadata files into the graph."""
         for path in paths:
             data = load_metadata_file(path)
-            self.deep_merge(data)
+            self.deep_merge(data, source=str(path))
+
+    def reload_file(self, path: Path) -> set[str]:
+        """Re-read a metadata file and replace its contributions to the graph."""
+        return self.replace_source(str(path), load_metadata_file(path))
+
+    def retract_source(self, source: str) -> set[str]:
+        """Remove every contribution of a source from the graph."""
+        affected = self.replace_source(source, {})
+        self.sources.pop(source, None)
+        self._source_details.pop(source, None)
+        return affected
+
+    def replace_source(self, source: str, new_data: dict[str, Any]) -> set[str]:
+        """
+        Replace the metadata contributed by a source, rebuilding only the nodes
+        it affects from the contributions of every source.
+
+        The result is the graph a full rebuild from all sources would produce.
+
+        Returns:
+            Names of the nodes that may have changed, been added or removed.
+
+        Raises:
+            ValueError: If a node is defined for another repository by another source.
+        """
+        others = [data for other, data in self.sources.items() if other != source]
+        blacklist = {name for data in [*others, new_data] for name in data.get("blacklist") or []}
+        new_details = _node_details(new_data)
+        for other, details in self._source_details.items():
+            if other == source:
+                continue
+            for name in new_details.keys() & details.keys():
+                if name not in blacklist:
+                    _check_repository(name, details[name].get("repository"), new_details[name])
+
+        old_details = self._source_details.get(source, {})
+        self.sources[source] = new_data
+        self._source_details[source] = new_details
+
+        previous_blacklist = self.blacklist
+        self.blacklist = blacklist
+        changed_blacklist = previous_blacklist ^ blacklist
+
+        affected = {
+            name
+            for name in old_details.keys() | new_details.keys()
+            if old_details.get(name) != new_details.get(name)
+        }
+        affected |= changed_blacklist
+        if changed_blacklist:
+            # blacklisted names are stripped from the dependencies of every node
+            for details in self._source_details.values():
+                for name, node_details in details.items():
+                    if changed_blacklist.intersection(node_details.get("depends_on") or []):
+                        affected.add(name)
+
+        # nodes only keep their position when no node was added, removed or moved
+        reorder = bool(changed_blacklist) or list(old_details) != list(new_details)
+        self._rebuild_nodes(affected, reorder)
+        return affected
+
+    def _rebuild_nodes(self, names: set[str], reorder: bool = True) -> None:
+        """
+        Recompute nodes from the contributions of every source, in merge order,
+        and when ``reorder`` is set, put the nodes back in the order a full
+        rebuild would define them.
+        """
+        for name in names:
+            contributions = [
+                details[name] for details in self._source_details.values() if name in details
+            ]
+            if not contributions or name in self.blacklist:
+                self.nodes.pop(name, None)
+                continue
+            node = NodeMetadata(name=name)
+            for details in contributions:
+                node.merge(details)
+            node.depends_on = [dep for dep in node.depends_on if dep not in self.blacklist]
+            self.nodes[name] = node
+
+        if reorder:
+            order = dict.fromkeys(
+                name for details in self._source_details.values() for name in details
+            )
+            self.nodes = {name: self.nodes[name] for name in order if name in self.nodes}
 
-    def mark_triggered(self, node_name: str, file: str, pattern: str) -> None:
+    def mark_triggered(
+        self, node_name: str, file: str, pattern: str, max_causes: int | None = MAX_CAUSES
+    ) -> None:
         """Mark a node as triggered by a file/pattern match."""
         if node_name in self.nodes:
-            self.nodes[node_name].mark_triggered(file, pattern)
+            self.nodes[node_name].mark_triggered(file, pattern, max_causes)
+
+    def build_trigger_index(self, repository: str | None = None) -> TriggerIndex:
+        """Compile the trigger patterns of every node belonging to a repository."""
+        return TriggerIndex.from_nodes(
+            node for node in self.nodes.values() if node.repository == repository
+        )
+
+    def match_triggers(
+        self,
+        changed_files: list[str],
+        index: TriggerIndex | None = None,
+        repository: str | None = None,
+        max_causes: int | None = MAX_CAUSES,
+    ) -> None:
+        """
+        Mark every node whose trigger patterns match one of the changed files.
+
+        Only nodes of the given repository are considered; files of a named
+        repository are recorded as ``<repository>:<file>``. At most
+        ``max_causes`` files are recorded per node, every match when None.
+        """
+        index = index or self.build_trigger_index(repository)
+        namespace = f"{repository}:" if repository else ""
+        for file, node_name, pattern in index.match(changed_files):
+            self.mark_triggered(node_name, namespace + file, pattern, max_causes)
+
+    def match_fingerprints(
+        self,
+        fingerprints: dict[str, str],
+        deployed: dict[str, str],
+        repository: str | None = None,
+    ) -> None:
+        """
+        Mark every node whose input fingerprint differs from the fingerprint of
+        its last successful deployment, including nodes never deployed.
+        """
+        for node in self.nodes.values():
+            if node.repository != repository:
+                continue
+            current = fingerprints.get(node.name, EMPTY_FINGERPRINT)
+            previous = deployed.get(node.name)
+            if current != previous:
+                reason = "never deployed" if previous is None else "inputs changed"
+                node.mark_undeployed(reason, current)
+
+    def count_patterns(self) -> int:
+        """Return the total number of trigger patterns across all nodes."""
+        return sum(
+            len(patterns) for node in self.nodes.values() for patterns in node.triggers.values()
+        )
 
     def find_missing_dependencies(self) -> dict[str, list[str]]:
         """Find dependencies that reference non-existent nodes."""
@@ -121,3 +334,144 @@ class DependencyGraph:
                 del pending_deps[node]
 
         return stages
+
+    def triggered_dependencies(self) -> dict[str, set[str]]:
+        """
+        Map every triggered node to the triggered nodes it must wait for.
+
+        Dependencies on nodes that are not triggered are followed through, so a
+        triggered node still waits for triggered ancestors reached via them.
+        """
+        predecessors = {
+            name: {dep for dep in node.depends_on if dep in self.nodes}
+            for name, node in self.nodes.items()
+        }
+        # nearest triggered ancestors of every node, resolved in dependency order
+        nearest: dict[str, set[str]] = {}
+        for name in topological_order(predecessors):
+            found: set[str] = set()
+            for dep in predecessors[name]:
+                if self.nodes[dep].triggered:
+                    found.add(dep)
+                else:
+                    found |= nearest[dep]
+            nearest[name] = found
+
+        return {name: nearest[name] for name, meta in self.nodes.items() if meta.triggered}
+
+    def build_triggered_schedule(
+        self,
+        durations: dict[str, float],
+        max_parallel: int | None = None,
+        default_duration: float = 60.0,
+    ) -> Schedule:
+        """
+        Build a duration-aware plan for triggered nodes without stage barriers.
+
+        Args:
+            durations: Historical duration of nodes, in seconds.
+            max_parallel: Maximum number of nodes running at once (None for unlimited).
+            default_duration: Duration assumed for nodes without history.
+        """
+        predecessors = self.triggered_dependencies()
+        expected = {name: durations.get(name, default_duration) for name in predecessors}
+        timeline = list_schedule(predecessors, expected, max_parallel)
+        path = critical_path(predecessors, expected)
+        on_path = set(path)
+
+        scheduled = [
+            ScheduledNode(
+                name=name,
+                start=start,
+                finish=finish,
+                duration=expected[name],
+                slot=slot,
+                depends_on=sorted(predecessors[name]),
+                critical=name in on_path,
+            )
+            for name, (start, finish, slot) in sorted(
+                timeline.items(), key=lambda item: (item[1][0], item[0])
+            )
+        ]
+        return Schedule(
+            nodes=scheduled,
+            max_parallel=max_parallel,
+            makespan=max((node.finish for node in scheduled), default=0.0),
+            staged_makespan=staged_makespan(self.build_triggered_stages(), expected, max_parallel),
+            critical_path=path,
+        )
+
+    def dependency_levels(self) -> dict[str, int]:
+        """
+        Return the length of the longest dependency chain below every node.
+
+        Dependencies on nodes missing from the graph are ignored. Triggered
+        nodes sharing a level always end up in the same stage.
+        """
+        levels: dict[str, int] = {}
+        self.update_dependency_levels(levels, set(self.nodes))
+        return levels
+
+    def update_dependency_levels(self, levels: dict[str, int], changed: set[str]) -> None:
+        """
+        Patch dependency levels in place after some nodes changed, were added or
+        removed; only those nodes and the nodes depending on them are recomputed.
+        """
+        dependents: dict[str, list[str]] = {}
+        for name, node in self.nodes.items():
+            for dep in node.depends_on:
+                dependents.setdefault(dep, []).append(name)
+
+        stale = set()
+        pending = list(changed)
+        while pending:
+            name = pending.pop()
+            if name not in stale:
+                stale.add(name)
+                pending.extend(dependents.get(name, ()))
+
+        for name in stale:
+            levels.pop(name, None)
+
+        def present(name: str) -> list[str]:
+            return [dep for dep in self.nodes[name].depends_on if dep in self.nodes]
+
+        # depth-first without recursion, so long dependency chains are fine
+        for root in stale:
+            if root not in self.nodes or root in levels:
+                continue
+            in_progress = {root}
+            stack = [(root, iter(present(root)))]
+            while stack:
+                name, deps = stack[-1]
+                for dep in deps:
+                    if dep in levels:
+                        continue
+                    if dep in in_progress:
+                        raise RuntimeError("Dependency resolution failed (possible cycle).")
+                    in_progress.add(dep)
+                    stack.append((dep, iter(present(dep))))
+                    break
+                else:
+                    stack.pop()
+                    in_progress.discard(name)
+                    levels[name] = max((levels[dep] + 1 for dep in present(name)), default=0)
+
+    def stages_from_levels(self, levels: dict[str, int]) -> list[list[str]]:
+        """
+        Build the triggered stages from precomputed dependency levels.
+
+        Equivalent to ``build_triggered_stages`` on a sanitized graph, without
+        walking the whole graph.
+        """
+        by_level: dict[int, list[str]] = {}
+        for name, node in self.nodes.items():
+            if node.triggered:
+                by_level.setdefault(levels[name], []).append(name)
+
+        stages = []
+        for stage_num, lvl in enumerate(sorted(by_level), 1):
+            for name in by_level[lvl]:
+                self.nodes[name].stage = stage_num
+            stages.append(sorted(by_level[lvl]))
+        return stages
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class TriggeredNode(BaseModel):
+    """A node triggered by a detection, with the causes of the trigger."""
+
+    name: str
+    depends_on: list[str] = Field(default_factory=list)
+    stage: int | None = None
+    triggered_by: list[dict[str, str]] = Field(default_factory=list)
+    match_counts: dict[str, int] = Field(default_factory=dict)
+    matched_files: int = 0
+    deploy_reason: str | None = None
+    fingerprint: str | None = None
+
+
+class DetectionResult(BaseModel):
+    """Structured result of a change detection between two commits."""
+
+    first_commit: str
+    last_commit: str
+    changed_files: list[str] = Field(default_factory=list)
+    triggered: dict[str, TriggeredNode] = Field(default_factory=dict)
+    stages: list[list[str]] = Field(default_factory=list)
+    cycles: list[list[str]] = Field(default_factory=list)
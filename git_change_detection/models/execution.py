@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+RunStatus = Literal["success", "failed", "skipped", "cancelled"]
+
+
+class NodeRun(BaseModel):
+    """Outcome of running the command of a single triggered node."""
+
+    name: str
+    status: RunStatus
+    returncode: int | None = None
+    start: float | None = None
+    finish: float | None = None
+
+    @property
+    def duration(self) -> float:
+        """Wall time spent running the node, in seconds."""
+        if self.start is None or self.finish is None:
+            return 0.0
+        return self.finish - self.start
+
+
+class ExecutionReport(BaseModel):
+    """Summary of a dependency-driven execution of the triggered nodes."""
+
+    runs: list[NodeRun] = Field(default_factory=list)
+    wall_time: float = 0.0
+    staged_time: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether every triggered node ran successfully."""
+        return all(run.status == "success" for run in self.runs)
+
+    @property
+    def saved(self) -> float:
+        """Wall time saved compared to running the same nodes stage by stage."""
+        return self.staged_time - self.wall_time
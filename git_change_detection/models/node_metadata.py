@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+# number of files recorded per triggered node, unless full detail is requested
+MAX_CAUSES = 20
+
+PatternSyntax = Literal["fnmatch", "glob"]
+DeployReason = Literal["never deployed", "inputs changed"]
 
 
 class NodeMetadata(BaseModel):
@@ -11,20 +17,72 @@ class NodeMetadata(BaseModel):
     name: str
     depends_on: list[str] = Field(default_factory=list)
     triggers: dict[str, list[str]] = Field(default_factory=dict)
+    pattern_syntax: PatternSyntax = "fnmatch"
+    # prefix -> pattern -> syntax, for patterns merged with another syntax
+    syntax_overrides: dict[str, dict[str, PatternSyntax]] = Field(default_factory=dict)
+    repository: str | None = None
     triggered: bool = False
     triggered_by: list[dict[str, str]] = Field(default_factory=list)
+    match_counts: dict[str, int] = Field(default_factory=dict)
+    matched_files: int = 0
+    # with a deploy state: why the node differs from its last deployment
+    deploy_reason: DeployReason | None = None
+    fingerprint: str | None = None
     stage: int | None = None
 
+    _last_file: str | None = PrivateAttr(default=None)
+
     def merge(self, details: dict[str, Any]) -> None:
-        """Merge a dict of details into this node metadata."""
+        """
+        Merge a dict of details into this node metadata.
+
+        Trigger patterns keep the syntax of the details they come from, so a
+        node defined in several metadata files can mix both dialects.
+        """
+        syntax = details.get("pattern_syntax") or "fnmatch"
+        if not self.triggers:
+            self.pattern_syntax = syntax
+        if details.get("repository"):
+            self.repository = details["repository"]
+
         new_depends = details.get("depends_on") or []
         self.depends_on = sorted(set(self.depends_on) | set(new_depends))
 
         for prefix, patterns in (details.get("triggers") or {}).items():
             existing = set(self.triggers.setdefault(prefix, []))
             self.triggers[prefix] = sorted(existing | set(patterns or []))
+            overrides = self.syntax_overrides.setdefault(prefix, {})
+            for pattern in patterns or []:
+                if syntax == self.pattern_syntax:
+                    overrides.pop(pattern, None)
+                else:
+                    overrides[pattern] = syntax
+            if not overrides:
+                del self.syntax_overrides[prefix]
+
+    def mark_undeployed(self, reason: DeployReason, fingerprint: str) -> None:
+        """Mark this node as triggered by inputs differing from its last deployment."""
+        self.triggered = True
+        self.deploy_reason = reason
+        self.fingerprint = fingerprint
+
+    def syntax_of(self, prefix: str, pattern: str) -> PatternSyntax:
+        """Return the syntax of a trigger pattern."""
+        return self.syntax_overrides.get(prefix, {}).get(pattern, self.pattern_syntax)
+
+    def mark_triggered(self, file: str, pattern: str, max_causes: int | None = MAX_CAUSES) -> None:
+        """
+        Mark this node as triggered and record the cause.
 
-    def mark_triggered(self, file: str, pattern: str) -> None:
-        """Mark this node as triggered and record the cause."""
+        Matches are counted per pattern, but only the first ``max_causes`` files
+        are kept in ``triggered_by`` (every match when None). All the matches of
+        a file are expected to be recorded one after the other.
+        """
         self.triggered = True
-        self.triggered_by.append({"file": file, "pattern": pattern})
+        self.match_counts[pattern] = self.match_counts.get(pattern, 0) + 1
+        new_file = file != self._last_file
+        if new_file:
+            self.matched_files += 1
+            self._last_file = file
+        if max_causes is None or (new_file and len(self.triggered_by) < max_causes):
+            self.triggered_by.append({"file": file, "pattern": pattern})
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class ScheduledNode(BaseModel):
+    """A triggered node placed on the deployment timeline."""
+
+    name: str
+    start: float
+    finish: float
+    duration: float
+    slot: int
+    depends_on: list[str] = Field(default_factory=list)
+    critical: bool = False
+
+
+class Schedule(BaseModel):
+    """A duration-aware deployment plan for the triggered nodes."""
+
+    nodes: list[ScheduledNode] = Field(default_factory=list)
+    max_parallel: int | None = None
+    makespan: float = 0.0
+    staged_makespan: float = 0.0
+    critical_path: list[str] = Field(default_factory=list)
+
+    @property
+    def saved(self) -> float:
+        """Predicted time saved compared to the stage-barrier plan."""
+        return self.staged_makespan - self.makespan
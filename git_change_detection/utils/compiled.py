@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.utils.patterns import GlobAutomaton, GlobState, TriggerIndex
+
+MAGIC = b"GCDC"
+# bumped on every incompatible change of the layout
+FORMAT_VERSION = 2
+# marks a missing string or state
+MISSING = 0xFFFFFFFF
+SYNTAXES = ("fnmatch", "glob")
+
+# magic, version, byte order, number of sections
+HEADER = struct.Struct("<4sHBxI")
+# offset and length in bytes of a section
+SECTION = struct.Struct("<QQ")
+
+# sections, in file order, with the number of integers per record
+SECTIONS = {
+    "string_offsets": 1,
+    "string_data": 0,
+    "nodes": 7,  # name, syntax, repository, deps start, deps count, triggers start, count
+    "depends_on": 1,  # node ids
+    "triggers": 3,  # prefix, pattern, syntax
+    "blacklist": 1,  # strings
+    "fnmatch": 3,  # node, pattern, regex
+    "states": 2,  # loops, globstar state
+    "literal": 3,  # state, segment, target state
+    "wildcard": 4,  # state, segment, regex, target state
+    "accepts": 4,  # state, node, label, negated
+    "order": 2,  # node, label
+}
+
+
+class _Strings:
+    """Interns the strings of an artifact."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+
+    def __call__(self, value: str | None) -> int:
+        if value is None:
+            return MISSING
+        if value not in self.ids:
+            self.ids[value] = len(self.ids)
+        return self.ids[value]
+
+
+def compile_graph(graph: DependencyGraph, path: Path) -> None:
+    """
+    Write a dependency graph and the trigger index of its main repository
+    nodes to a binary artifact, loaded back by ``CompiledMetadata``.
+
+    Dependencies on missing nodes are dropped, like ``sanitize_dependencies``.
+    The artifact is replaced atomically.
+    """
+    intern = _Strings()
+    ids = {name: i for i, name in enumerate(graph.nodes)}
+    tables: dict[str, list[int]] = {name: [] for name in SECTIONS}
+
+    for node in graph.nodes.values():
+        deps = [ids[dep] for dep in node.depends_on if dep in ids]
+        triggers = [
+            (intern(prefix), intern(pattern), SYNTAXES.index(node.syntax_of(prefix, pattern)))
+            for prefix, patterns in node.triggers.items()
+            for pattern in patterns
+        ]
+        tables["nodes"] += [
+            intern(node.name),
+            SYNTAXES.index(node.pattern_syntax),
+            intern(node.repository),
+            len(tables["depends_on"]),
+            len(deps),
+            len(tables["triggers"]) // 3,
+            len(triggers),
+        ]
+        tables["depends_on"] += deps
+        for entry in triggers:
+            tables["triggers"] += entry
+    tables["blacklist"] = [intern(name) for name in sorted(graph.blacklist)]
+
+    index = graph.build_trigger_index()
+    for node, pattern, regex in index.fnmatch_patterns:
+        tables["fnmatch"] += [ids[node], intern(pattern), intern(regex)]
+    for i, state in enumerate(index.automaton.states):
+        tables["states"] += [
+            int(state.loops),
+            MISSING if state.globstar is None else state.globstar,
+        ]
+        for segment, target in state.literal.items():
+            tables["literal"] += [i, intern(segment), target]
+        for segment, (regex, target) in state.wildcard.items():
+            tables["wildcard"] += [i, intern(segment), intern(regex.pattern), target]
+        for node, label, negated in state.accepts:
+            tables["accepts"] += [i, ids[node], intern(label), int(negated)]
+    for node, label in index.order:
+        tables["order"] += [ids[node], intern(label)]
+
+    encoded = [value.encode() for value in intern.ids]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    tables["string_offsets"] = offsets
+
+    sections = [
+        b"".join(encoded) if name == "string_data" else array("I", values).tobytes()
+        for name, values in tables.items()
+    ]
+    byteorder = 0 if sys.byteorder == "little" else 1
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, byteorder, len(sections))
+    offset = HEADER.size + SECTION.size * len(sections)
+    directory, body = [], []
+    for data in sections:
+        padding = -offset % 4
+        body.append(b"\0" * padding + data)
+        offset += padding
+        directory.append(SECTION.pack(offset, len(data)))
+        offset += len(data)
+    _write_atomic(Path(path), header + b"".join(directory) + b"".join(body))
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a file through a temporary file of the same directory renamed over
+    it, so that readers, including processes mapping the previous artifact,
+    never see a partially written one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class CompiledMetadata:
+    """
+    A compiled metadata artifact, memory-mapped.
+
+    Integer tables are used in place from the mapping; strings are decoded on
+    first use, and no metadata file, regular expression translation or glob
+    parsing is involved in loading the graph and its trigger index.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise ValueError(f"Invalid compiled metadata {path}: empty file") from e
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Invalid compiled metadata {path}: truncated header")
+        magic, version, byteorder, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"Invalid compiled metadata {path}: not a compiled artifact")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Compiled metadata {path} has format version {version}, expected "
+                f"{FORMAT_VERSION}: compile it again"
+            )
+        if byteorder != (0 if sys.byteorder == "little" else 1) or count != len(SECTIONS):
+            raise ValueError(f"Invalid compiled metadata {path}: compile it on this platform")
+
+        view = memoryview(self._mmap)
+        self._sections: dict[str, memoryview] = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            if offset + length > len(self._mmap):
+                raise ValueError(f"Invalid compiled metadata {path}: truncated file")
+            data = view[offset : offset + length]
+            self._sections[name] = data if name == "string_data" else data.cast("I")
+        self._strings: dict[int, str] = {}
+
+    def string(self, i: int) -> str | None:
+        """Return an interned string."""
+        if i == MISSING:
+            return None
+        value = self._strings.get(i)
+        if value is None:
+            offsets = self._sections["string_offsets"]
+            value = bytes(self._sections["string_data"][offsets[i] : offsets[i + 1]]).decode()
+            self._strings[i] = value
+        return value
+
+    def _records(self, name: str) -> list[tuple[int, ...]]:
+        width = SECTIONS[name]
+        values = self._sections[name]
+        return [tuple(values[i : i + width]) for i in range(0, len(values), width)]
+
+    def graph(self) -> DependencyGraph:
+        """Return the merged dependency graph, blacklist applied."""
+        string = self.string
+        deps = self._sections["depends_on"]
+        triggers = self._sections["triggers"]
+        nodes = self._records("nodes")
+        names = [string(record[0]) for record in nodes]
+
+        graph = DependencyGraph()
+        for name, (_, syntax, repository, dstart, dcount, tstart, tcount) in zip(
+            names, nodes, strict=True
+        ):
+            node_triggers: dict[str, list[str]] = {}
+            overrides: dict[str, dict[str, str]] = {}
+            for i in range(tstart, tstart + tcount):
+                prefix, pattern = string(triggers[3 * i]), string(triggers[3 * i + 1])
+                node_triggers.setdefault(prefix, []).append(pattern)
+                if triggers[3 * i + 2] != syntax:
+                    overrides.setdefault(prefix, {})[pattern] = SYNTAXES[triggers[3 * i + 2]]
+            graph.nodes[name] = NodeMetadata(
+                name=name,
+                depends_on=[names[dep] for dep in deps[dstart : dstart + dcount]],
+                triggers=node_triggers,
+                pattern_syntax=SYNTAXES[syntax],
+                syntax_overrides=overrides,
+                repository=string(repository),
+            )
+        graph.blacklist = {string(i) for i in self._sections["blacklist"]}
+        return graph
+
+    def trigger_index(self) -> TriggerIndex:
+        """Return the trigger index of the main repository nodes."""
+        string = self.string
+        names = [string(record[0]) for record in self._records("nodes")]
+
+        fnmatch_patterns = [
+            (names[node], string(pattern), string(regex))
+            for node, pattern, regex in self._records("fnmatch")
+        ]
+        states = []
+        for loops, globstar in self._records("states"):
+            state = GlobState(loops=bool(loops))
+            state.globstar = None if globstar == MISSING else globstar
+            states.append(state)
+        for state, segment, target in self._records("literal"):
+            states[state].literal[string(segment)] = target
+        for state, segment, regex, target in self._records("wildcard"):
+            states[state].wildcard[string(segment)] = (re.compile(string(regex)), target)
+        for state, node, label, negated in self._records("accepts"):
+            states[state].accepts.append((names[node], string(label), bool(negated)))
+        order = [(names[node], string(label)) for node, label in self._records("order")]
+
+        return TriggerIndex.from_parts(fnmatch_patterns, GlobAutomaton.from_states(states), order)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shlex
+import signal
+import time
+from collections.abc import Callable, Mapping
+
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.execution import ExecutionReport, NodeRun
+from git_change_detection.utils.scheduling import staged_makespan
+
+LogCallback = Callable[[str, str], None]
+
+# bytes read from a node output at once, lines of any length are reassembled
+READ_SIZE = 65536
+
+
+async def _run_node(
+    node: str, command: str, cwd: str | None, log: LogCallback
+) -> tuple[int, float, float]:
+    """Run a single node command, streaming its merged output line by line."""
+    start = time.monotonic()
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=cwd,
+        env={**os.environ, "GCD_NODE": node},
+        start_new_session=True,
+    )
+    try:
+        pending: list[bytes] = []
+        while chunk := await proc.stdout.read(READ_SIZE):
+            *lines, rest = chunk.split(b"\n")
+            for line in lines:
+                log(node, b"".join([*pending, line]).decode(errors="replace"))
+                pending.clear()
+            pending.append(rest)
+        if any(pending):
+            log(node, b"".join(pending).decode(errors="replace"))
+        returncode = await proc.wait()
+    except BaseException:
+        # cancelled, or failed reading the output
+        if proc.returncode is None:
+            # kill the whole process group, so children do not keep the pipe open
+            os.killpg(proc.pid, signal.SIGKILL)
+            await proc.wait()
+        raise
+    return returncode, start, time.monotonic()
+
+
+async def run_graph(
+    predecessors: Mapping[str, set[str]],
+    command_template: str,
+    max_parallel: int | None = None,
+    fail_fast: bool = False,
+    cwd: str | None = None,
+    log: LogCallback | None = None,
+) -> dict[str, NodeRun]:
+    """
+    Run a command for every node of a DAG, without stage barriers.
+
+    A node starts as soon as all its predecessors succeeded. When a node fails,
+    including when its command cannot be run, its descendants are skipped; with
+    ``fail_fast`` every running node is cancelled and nothing new is started.
+
+    Args:
+        predecessors: Mapping of node -> nodes that must succeed before it.
+        command_template: Shell command, ``{node}`` is replaced by the quoted node name.
+        max_parallel: Maximum number of concurrent commands (None for unlimited).
+        fail_fast: Stop everything on the first failure.
+        cwd: Working directory of the commands.
+        log: Callback receiving (node, line) for every output line.
+
+    Returns:
+        Mapping of node -> run outcome, with times relative to the start of the run.
+    """
+    log = log or (lambda node, line: None)
+    remaining = {node: set(preds) for node, preds in predecessors.items()}
+    successors: dict[str, list[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    limit = max_parallel or len(predecessors) or 1
+    origin = time.monotonic()
+    results: dict[str, NodeRun] = {}
+    ready = sorted(node for node, preds in remaining.items() if not preds)
+    running: dict[asyncio.Task, str] = {}
+    aborted = False
+
+    def skip_descendants(node: str) -> None:
+        stack = list(successors[node])
+        while stack:
+            succ = stack.pop()
+            if succ not in results:
+                results[succ] = NodeRun(name=succ, status="skipped")
+                stack.extend(successors[succ])
+
+    while ready or running:
+        while ready and len(running) < limit and not aborted:
+            node = ready.pop(0)
+            command = command_template.replace("{node}", shlex.quote(node))
+            running[asyncio.create_task(_run_node(node, command, cwd, log))] = node
+
+        if not running:
+            break
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=running.__getitem__):
+            node = running.pop(task)
+            try:
+                returncode, start, finish = task.result()
+            except (OSError, ValueError, RuntimeError) as e:
+                # the command could not be started or its output not be read
+                log(node, f"error: {e}")
+                results[node] = NodeRun(name=node, status="failed")
+            else:
+                results[node] = NodeRun(
+                    name=node,
+                    status="success" if returncode == 0 else "failed",
+                    returncode=returncode,
+                    start=start - origin,
+                    finish=finish - origin,
+                )
+            if results[node].status == "failed":
+                skip_descendants(node)
+                aborted = aborted or fail_fast
+                continue
+            for succ in successors[node]:
+                remaining[succ].discard(node)
+                if not remaining[succ] and succ not in results:
+                    ready.append(succ)
+            ready.sort()
+
+        if aborted and running:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for node in running.values():
+                results[node] = NodeRun(name=node, status="cancelled")
+            running.clear()
+
+    for node in predecessors:
+        results.setdefault(node, NodeRun(name=node, status="skipped"))
+    return results
+
+
+def execute_triggered(
+    graph: DependencyGraph,
+    command_template: str,
+    max_parallel: int | None = None,
+    fail_fast: bool = False,
+    cwd: str | None = None,
+    log: LogCallback | None = None,
+) -> ExecutionReport:
+    """
+    Run the command of every triggered node in dependency order.
+
+    The wall time is compared with the time the same runs would have taken
+    with the stage barriers of ``build_triggered_stages``.
+    """
+    predecessors = graph.triggered_dependencies()
+    stages = graph.build_triggered_stages()
+
+    results = asyncio.run(
+        run_graph(predecessors, command_template, max_parallel, fail_fast, cwd, log)
+    )
+
+    measured = {node: run.duration for node, run in results.items()}
+    return ExecutionReport(
+        runs=[results[node] for stage in stages for node in stage],
+        wall_time=max((run.finish or 0.0 for run in results.values()), default=0.0),
+        staged_time=staged_makespan(stages, measured, max_parallel),
+    )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+
+from git.objects import Tree
+
+from git_change_detection.utils.patterns import TriggerIndex
+
+# fingerprint of a node no path matches
+EMPTY_FINGERPRINT = hashlib.sha256().hexdigest()
+
+
+class Fingerprinter:
+    """
+    Computes a fingerprint of the inputs of every node from git object ids.
+
+    The fingerprint of a node is a Merkle digest of the paths matching its
+    triggers and their blob ids (commit ids for submodules): it changes exactly
+    when one of those files is added, removed or modified, and no file is read.
+
+    Digests are memoised by tree id and path, so fingerprinting another commit
+    only walks the trees that changed since, and directories that no trigger
+    can match are never walked.
+    """
+
+    def __init__(self, index: TriggerIndex) -> None:
+        self.index = index
+        self._digests: dict[tuple[str, str], dict[str, str]] = {}
+        self.trees_walked = 0
+
+    def fingerprints(self, tree: Tree) -> dict[str, str]:
+        """
+        Fingerprint the nodes of the index against the content of a tree.
+
+        Returns:
+            Mapping of node -> fingerprint, for nodes matching at least one
+            path; the others have ``EMPTY_FINGERPRINT``.
+        """
+        return self._digest(tree, "")
+
+    def _digest(self, tree: Tree, path: str) -> dict[str, str]:
+        key = (tree.hexsha, path)
+        cached = self._digests.get(key)
+        if cached is not None:
+            return cached
+        self.trees_walked += 1
+
+        entries: dict[str, set[str]] = {}
+        files: dict[str, str] = {}
+        for item in tree:
+            item_path = f"{path}/{item.name}" if path else item.name
+            if item.type == "tree":
+                if self.index.may_match_within(item_path):
+                    for node, digest in self._digest(item, item_path).items():
+                        entries.setdefault(node, set()).add(f"{item.name}/\0{digest}")
+            else:
+                files[item_path] = f"{item.name}\0{item.hexsha}"
+        for file_path, node, _ in self.index.match(files):
+            entries.setdefault(node, set()).add(files[file_path])
+
+        digests = {
+            node: hashlib.sha256("\n".join(sorted(lines)).encode()).hexdigest()
+            for node, lines in entries.items()
+        }
+        self._digests[key] = digests
+        return digests
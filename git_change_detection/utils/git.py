@@ -1,10 +1,20 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from git import BadName, InvalidGitRepositoryError, NoSuchPathError, Repo
+from git import BadName, GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+from git.objects import Commit
+
+# file mode git uses for submodule pointers (gitlinks)
+GITLINK_MODE = 0o160000
 
 
 def get_changed_files(
-    first_commit: str, last_commit: str, repo_path: Path | None = None
+    first_commit: str,
+    last_commit: str,
+    repo_path: Path | None = None,
+    submodules: bool = False,
+    max_workers: int | None = None,
 ) -> list[str]:
     """
     Return a list of files changed between two commits in a Git repo.
@@ -13,6 +23,9 @@ def get_changed_files(
         first_commit: The base commit (older).
         last_commit: The target commit (newer).
         repo_path: Path to the repository (defaults to current working dir).
+        submodules: Also report files changed inside submodules whose pointer
+            moved, prefixed with the submodule path.
+        max_workers: Maximum number of submodules diffed concurrently.
 
     Returns:
         List of changed file paths (as strings, relative to repo root).
@@ -34,13 +47,253 @@ def get_changed_files(
     except BadName as e:
         raise RuntimeError(f"Commit '{last_commit}' not found in repository.") from e
 
+    return sorted(_diff_commits(repo, commit_a, commit_b, submodules, max_workers))
+
+
+def get_commit(commit: str, repo_path: Path | None = None) -> Commit:
+    """
+    Return a commit of a Git repo.
+
+    Args:
+        commit: Commit, branch or tag to resolve.
+        repo_path: Path to the repository (defaults to current working dir).
+    """
+    repo_path = Path(repo_path or Path.cwd())
+
+    try:
+        repo = Repo(repo_path, search_parent_directories=True)
+    except (InvalidGitRepositoryError, NoSuchPathError) as e:
+        raise RuntimeError(f"{repo_path} is not a valid Git repository.") from e
+
+    try:
+        return repo.commit(commit)
+    except (BadName, ValueError) as e:
+        raise RuntimeError(f"Commit '{commit}' not found in repository.") from e
+
+
+def get_changed_files_many(
+    ranges: dict[str | None, tuple[str, str, Path | None]],
+    submodules: bool = False,
+    max_workers: int | None = None,
+) -> dict[str | None, list[str]]:
+    """
+    Diff several repositories concurrently.
+
+    Args:
+        ranges: Mapping of repository name -> (first commit, last commit, path).
+        submodules: Also report files changed inside updated submodules.
+        max_workers: Maximum number of repositories diffed concurrently.
+
+    Returns:
+        Mapping of repository name -> changed file paths.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(get_changed_files, first, last, path, submodules)
+            for name, (first, last, path) in ranges.items()
+        }
+        changes = {}
+        for name, future in futures.items():
+            try:
+                changes[name] = future.result()
+            except RuntimeError as e:
+                raise RuntimeError(f"{name}: {e}" if name else str(e)) from e
+        return changes
+
+
+def _diff_commits(
+    repo: Repo,
+    commit_a: Commit,
+    commit_b: Commit,
+    submodules: bool = False,
+    max_workers: int | None = None,
+) -> set[str]:
+    """Return the paths changed between two commits, descending into submodules."""
     diff = commit_a.diff(commit_b, paths=None, create_patch=False)
 
     changed_files = set()
+    gitlinks = []
     for d in diff:
         if d.a_path:
             changed_files.add(d.a_path)
         if d.b_path:
             changed_files.add(d.b_path)
+        if submodules and GITLINK_MODE in (d.a_mode, d.b_mode):
+            old = d.a_blob.hexsha if d.a_mode == GITLINK_MODE else None
+            new = d.b_blob.hexsha if d.b_mode == GITLINK_MODE else None
+            gitlinks.append((d.b_path or d.a_path, old, new))
+
+    if gitlinks:
+        # resolve the submodule repositories here: the parent Repo is not thread-safe
+        names = _submodule_names(repo, commit_b, commit_a)
+        jobs = [(_submodule_dir(repo, path, names), path, old, new) for path, old, new in gitlinks]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda job: _diff_submodule(*job, max_workers=max_workers), jobs)
+            for inner in results:
+                changed_files.update(inner)
+
+    return changed_files
+
+
+def _diff_submodule(
+    sub_dir: Path, path: str, old: str | None, new: str | None, max_workers: int | None = None
+) -> set[str]:
+    """
+    Return the files changed inside a submodule between two pinned commits,
+    prefixed with the submodule path. Only local objects are used.
+    """
+    sub = Repo(sub_dir)
+
+    commits = []
+    for sha in (old, new):
+        if sha is None:
+            commits.append(None)
+            continue
+        try:
+            commits.append(sub.commit(sha))
+        except (BadName, ValueError) as e:
+            raise RuntimeError(
+                f"Commit '{sha}' of submodule '{path}' not found locally, fetch it first."
+            ) from e
+
+    commit_a, commit_b = commits
+    if commit_a is not None and commit_b is not None:
+        inner = _diff_commits(sub, commit_a, commit_b, True, max_workers)
+    else:
+        # submodule added or removed: every file it pins changed
+        commit = commit_a or commit_b
+        inner = {item.path for item in commit.tree.traverse() if item.type == "blob"}
+
+    return {f"{path}/{file}" for file in inner}
+
+
+def _submodule_names(repo: Repo, *commits: Commit) -> dict[str, str]:
+    """Map submodule paths to names from the .gitmodules of the commits, earlier first."""
+    names: dict[str, str] = {}
+    for commit in commits:
+        try:
+            output = repo.git.config(
+                "--blob",
+                f"{commit.hexsha}:.gitmodules",
+                "-z",
+                "--get-regexp",
+                r"^submodule\..*\.path$",
+            )
+        except GitCommandError:
+            continue
+        for entry in filter(None, output.split("\0")):
+            key, _, path = entry.partition("\n")
+            names.setdefault(path, key[len("submodule.") : -len(".path")])
+    return names
 
-    return sorted(changed_files)
+
+def _submodule_dir(repo: Repo, path: str, names: dict[str, str]) -> Path:
+    """Return the repository of a submodule, from its checkout or its local git dir."""
+    candidates = [Path(repo.git_dir) / "modules" / path]
+    if path in names:
+        candidates.insert(0, Path(repo.git_dir) / "modules" / names[path])
+    if repo.working_tree_dir:
+        candidates.insert(0, Path(repo.working_tree_dir) / path)
+
+    for candidate in _lazy_candidates(repo, path, candidates):
+        try:
+            Repo(candidate)
+        except (InvalidGitRepositoryError, NoSuchPathError):
+            continue
+        return candidate
+    raise RuntimeError(f"Submodule '{path}' is not available locally, initialise it first.")
+
+
+def _lazy_candidates(repo: Repo, path: str, candidates: list[Path]) -> Iterator[Path]:
+    """Yield the candidates, then the git dirs of the checked-out .gitmodules as a last resort."""
+    yield from candidates
+    try:
+        submodules = [sm for sm in repo.submodules if sm.path == path]
+    except (OSError, ValueError):
+        return
+    for sm in submodules:
+        yield Path(repo.git_dir) / "modules" / sm.name
+
+
+def resolve_merge_base(
+    ref: str,
+    last_commit: str,
+    repo_path: Path | None = None,
+    remote: str = "origin",
+    deepen: int = 32,
+) -> str:
+    """
+    Return the merge base of a reference and the last commit, fetching only as
+    much history as needed in shallow clones.
+
+    A reference missing locally is fetched from the remote as a branch. While no
+    merge base can be found in a shallow clone, the clone is deepened with
+    ``git fetch --deepen``, doubling the depth at each attempt, until the merge
+    base appears or the full history has been fetched.
+
+    Args:
+        ref: Reference to compare against (e.g. the target branch).
+        last_commit: The target commit (newer).
+        repo_path: Path to the repository (defaults to current working dir).
+        remote: Remote used to fetch missing history.
+        deepen: Number of commits fetched by the first deepening.
+
+    Returns:
+        The hexsha of the merge base.
+    """
+    repo_path = Path(repo_path or Path.cwd())
+
+    try:
+        repo = Repo(repo_path, search_parent_directories=True)
+    except (InvalidGitRepositoryError, NoSuchPathError) as e:
+        raise RuntimeError(f"{repo_path} is not a valid Git repository.") from e
+
+    try:
+        commit_b = repo.commit(last_commit)
+    except BadName as e:
+        raise RuntimeError(f"Commit '{last_commit}' not found in repository.") from e
+
+    try:
+        commit_a = repo.commit(ref)
+    except BadName:
+        commit_a = repo.commit(_fetch_branch(repo, remote, ref))
+
+    step = deepen
+    while True:
+        bases = repo.merge_base(commit_a, commit_b)
+        if bases:
+            return bases[0].hexsha
+        boundary = _shallow_boundary(repo)
+        if boundary is None:
+            raise RuntimeError(f"'{ref}' and '{last_commit}' have no common ancestor.")
+        try:
+            repo.git.fetch(remote, deepen=step)
+        except GitCommandError as e:
+            raise RuntimeError(f"Failed to deepen the clone from '{remote}': {e.stderr}") from e
+        if _shallow_boundary(repo) == boundary:
+            raise RuntimeError(f"Deepening from '{remote}' did not fetch any missing history.")
+        step *= 2
+
+
+def _shallow_boundary(repo: Repo) -> str | None:
+    """Return the shallow boundary commits of a shallow clone, or None for a full clone."""
+    shallow = Path(repo.common_dir) / "shallow"
+    return shallow.read_text(encoding="utf-8") if shallow.exists() else None
+
+
+def _is_shallow(repo: Repo) -> bool:
+    """Return whether the repository is a shallow clone."""
+    return _shallow_boundary(repo) is not None
+
+
+def _fetch_branch(repo: Repo, remote: str, branch: str) -> str:
+    """Fetch the tip of a remote branch into its remote-tracking reference."""
+    if branch.startswith(f"{remote}/"):
+        branch = branch[len(remote) + 1 :]
+    tracking = f"refs/remotes/{remote}/{branch}"
+    options = {"depth": 1} if _is_shallow(repo) else {}
+    try:
+        repo.git.fetch(remote, f"+refs/heads/{branch}:{tracking}", **options)
+    except GitCommandError as e:
+        raise RuntimeError(f"Reference '{branch}' not found locally nor on '{remote}'.") from e
+    return tracking
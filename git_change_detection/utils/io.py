@@ -1,4 +1,5 @@
 import json
+import sqlite3
 from importlib import resources
 from pathlib import Path
 from typing import Any
@@ -25,3 +26,86 @@ def load_metadata_file(path: Path) -> dict[str, Any]:
             return tomllib.load(f)
         else:
             raise ValueError(f"Unsupported metadata format: {path}")
+
+
+def load_durations(path: Path) -> dict[str, float]:
+    """
+    Load historical node durations (in seconds) from a JSON or SQLite file.
+
+    JSON files map node names to a duration or a list of past durations.
+    SQLite files must contain a ``durations(node TEXT, seconds REAL)`` table,
+    with one row per recorded run. Multiple samples are averaged.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if not isinstance(raw, dict):
+            raise ValueError(f"Invalid durations file {path}: expected an object of node durations")
+        durations = {}
+        for node, value in raw.items():
+            samples = value if isinstance(value, list) else [value]
+            if samples:
+                try:
+                    durations[node] = sum(float(s) for s in samples) / len(samples)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid durations of node '{node}' in {path}: {e}") from e
+        return durations
+    elif suffix in {".db", ".sqlite", ".sqlite3"}:
+        if not path.exists():
+            raise OSError(f"Durations database not found: {path}")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT node, AVG(seconds) FROM durations GROUP BY node").fetchall()
+        except sqlite3.Error as e:
+            raise ValueError(f"Invalid durations database {path}: {e}") from e
+        finally:
+            conn.close()
+        return {node: float(seconds) for node, seconds in rows}
+    else:
+        raise ValueError(f"Unsupported durations format: {path}")
+
+
+def load_deployed(path: Path) -> dict[str, str]:
+    """
+    Load the fingerprint of the last successful deployment of every node from
+    a SQLite deploy-state file. A missing file means nothing was deployed yet.
+    """
+    if not path.exists():
+        return {}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT node, fingerprint FROM deployments").fetchall()
+    except sqlite3.Error as e:
+        raise ValueError(f"Invalid deploy state {path}: {e}") from e
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def record_deployed(path: Path, fingerprints: dict[str, str], commit: str) -> None:
+    """
+    Record successfully deployed nodes in a SQLite deploy-state file, created
+    if needed, replacing their previous fingerprints.
+
+    Args:
+        path: The deploy-state file.
+        fingerprints: Mapping of deployed node -> fingerprint of its inputs.
+        commit: The commit that was deployed.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS deployments ("
+                "node TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, commit_sha TEXT NOT NULL, "
+                "deployed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO deployments (node, fingerprint, commit_sha) VALUES (?, ?, ?)",
+                [(node, fingerprint, commit) for node, fingerprint in fingerprints.items()],
+            )
+    except sqlite3.Error as e:
+        raise ValueError(f"Invalid deploy state {path}: {e}") from e
+    finally:
+        conn.close()
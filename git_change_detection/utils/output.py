@@ -1,12 +1,37 @@
 from __future__ import annotations
 
 import json
+import sys
 from typing import Literal
 
+import yaml
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
 
 from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.execution import ExecutionReport
+from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.models.schedule import Schedule
+from git_change_detection.utils.scheduling import transitive_reduction
+
+# number of files listed per triggered node in summary mode
+SUMMARY_FILES = 5
+
+# top-level keys of a GitLab pipeline that cannot be used as job names
+GITLAB_KEYWORDS = {
+    "after_script",
+    "before_script",
+    "cache",
+    "default",
+    "image",
+    "include",
+    "services",
+    "stages",
+    "types",
+    "variables",
+    "workflow",
+}
 
 
 def render_output(
@@ -14,56 +39,279 @@ def render_output(
     changed_files: list[str],
     cycles: list[list[str]],
     stages: list[list[str]],
-    fmt: Literal["table", "json"] = "table",
+    fmt: Literal["table", "json", "plain"] = "table",
+    summary: bool = False,
+    max_rows: int | None = None,
+    max_files: int | None = None,
 ) -> None:
     """
-    Render the analysis results to either rich tables (default) or JSON.
+    Render the analysis results to rich tables (default), plain text or JSON.
+
+    The whole report is built in memory and written in a single call, so large
+    results do not turn into thousands of console writes.
 
     Args:
         graph: The dependency graph after processing.
         changed_files: Files detected as changed between commits.
         cycles: List of dependency cycles (if any).
         stages: Ordered deployment stages with triggered nodes.
-        fmt: Output format ("table" or "json").
+        fmt: Output format ("table", "plain" or "json").
+        summary: Only show counts and the first files of each triggered node.
+        max_rows: Maximum number of triggered nodes listed.
+        max_files: Maximum number of files listed, overall and per node.
     """
     if fmt == "json":
         print(json.dumps({n: node.model_dump() for n, node in graph.nodes.items()}))
         return
 
+    if summary and max_files is None:
+        max_files = SUMMARY_FILES
+    triggered = [node for node in graph.nodes.values() if node.triggered]
+    if fmt == "plain":
+        sys.stdout.write(
+            _render_plain(triggered, changed_files, cycles, stages, summary, max_rows, max_files)
+        )
+        return
+
     console = Console()
+    with console.capture() as capture:
+        console.print("\n[bold]Changed files[/bold]")
+        shown, hidden = _truncate(changed_files, max_files)
+        lines = [f"  {f}" for f in shown] + ([f"  ... and {hidden} more"] if hidden else [])
+        if lines:
+            console.print("\n".join(lines), markup=False, highlight=False)
 
-    console.print("\n[bold]Changed files[/bold]")
-    for f in changed_files:
-        console.print(f"  {f}")
-
-    console.print("\n[bold]Triggered Nodes[/bold]")
-    triggered = [n for n, node in graph.nodes.items() if node.triggered]
-    if triggered:
-        t = Table(
-            show_header=True,
-            header_style="bold cyan",
-            show_lines=True,
-        )
+        console.print("\n[bold]Triggered Nodes[/bold]")
+        if triggered:
+            t = Table(
+                show_header=True,
+                header_style="bold cyan",
+                show_lines=True,
+            )
+            t.add_column("Node", style="magenta")
+            t.add_column("File", style="green")
+            t.add_column("Pattern", style="yellow")
+
+            rows, hidden_rows = _truncate(triggered, max_rows)
+            for node in rows:
+                files, patterns = _node_causes(node)
+                shown, _ = _truncate(files, max_files)
+                hidden = node.matched_files - len(shown)
+                file_lines = shown + ([f"... and {hidden} more"] if hidden > 0 else [])
+                if summary and not node.deploy_reason:
+                    file_lines.insert(0, f"{node.matched_files} files")
+                    pattern_lines = [f"{p} ({count})" for p, count in patterns.items()]
+                else:
+                    pattern_lines = list(patterns)
+                name = Text(node.name)
+                if node.deploy_reason:
+                    name.append(f"\n{_deploy_reason(node)}", style="dim")
+                t.add_row(
+                    name,
+                    Text("\n".join(file_lines)),
+                    Text("\n".join(pattern_lines)),
+                )
+            console.print(t)
+            if hidden_rows:
+                console.print(f"[dim]... and {hidden_rows} more triggered nodes[/dim]")
+        else:
+            console.print("[dim](none)[/dim]")
+
+        if cycles:
+            console.print("\n[red]Dependency cycles detected:[/red]")
+            for c in cycles:
+                console.print(" → ".join(c))
+
+        console.print("\n[bold]Deployment Stages[/bold]")
+        for i, stage in enumerate(stages, 1):
+            console.print(
+                f"  Stage {i}: {', '.join(stage)}"  # pylint: disable=inconsistent-quotes
+            )
+    sys.stdout.write(capture.get())
+
+
+def _truncate(items: list, limit: int | None) -> tuple[list, int]:
+    """Return at most ``limit`` items and the number of items left out."""
+    if limit is None or len(items) <= limit:
+        return list(items), 0
+    return list(items[:limit]), len(items) - limit
+
+
+def _node_causes(node: NodeMetadata) -> tuple[list[str], dict[str, int]]:
+    """Return the sorted files recorded for a node and the match count of each pattern."""
+    files = sorted({cause["file"] for cause in node.triggered_by})
+    return files, dict(sorted(node.match_counts.items()))
+
+
+def _deploy_reason(node: NodeMetadata) -> str:
+    """Describe why a node differs from its last deployment."""
+    return f"{node.deploy_reason}, fingerprint {node.fingerprint[:12]}"
+
+
+def _render_plain(
+    triggered: list[NodeMetadata],
+    changed_files: list[str],
+    cycles: list[list[str]],
+    stages: list[list[str]],
+    summary: bool,
+    max_rows: int | None,
+    max_files: int | None,
+) -> str:
+    """Build the plain-text report, without any terminal markup."""
+    lines = ["", f"Changed files ({len(changed_files)})"]
+    shown, hidden = _truncate(changed_files, max_files)
+    lines += [f"  {f}" for f in shown]
+    if hidden:
+        lines.append(f"  ... and {hidden} more")
+
+    lines += ["", f"Triggered Nodes ({len(triggered)})"]
+    rows, hidden_rows = _truncate(triggered, max_rows)
+    for node in rows:
+        files, patterns = _node_causes(node)
+        detail = _deploy_reason(node) if node.deploy_reason else f"{node.matched_files} files"
+        lines.append(f"  {node.name} ({detail})")
+        for pattern, count in patterns.items():
+            lines.append(
+                f"    pattern: {pattern} ({count})" if summary else f"    pattern: {pattern}"
+            )
+        shown, _ = _truncate(files, max_files)
+        hidden = node.matched_files - len(shown)
+        lines += [f"    file: {f}" for f in shown]
+        if hidden > 0:
+            lines.append(f"    ... and {hidden} more")
+    if not triggered:
+        lines.append("  (none)")
+    if hidden_rows:
+        lines.append(f"  ... and {hidden_rows} more triggered nodes")
+
+    if cycles:
+        lines += ["", "Dependency cycles detected:"]
+        lines += [" → ".join(c) for c in cycles]
+
+    lines += ["", "Deployment Stages"]
+    lines += [f"  Stage {i}: {', '.join(stage)}" for i, stage in enumerate(stages, 1)]
+    return "\n".join(lines) + "\n"
+
+
+def render_pipeline(
+    graph: DependencyGraph, template: str = ".gcd-node", includes: list[str] | None = None
+) -> None:
+    """
+    Render the triggered nodes as a GitLab child pipeline, in YAML.
+
+    Every triggered node becomes a job extending ``template``, with the node
+    name in its ``GCD_NODE`` variable. Jobs have no stages: their ``needs`` are
+    the transitive reduction of the triggered dependencies, so each job starts
+    as soon as the nodes it depends on are deployed.
+
+    Args:
+        graph: The dependency graph after processing, without cycles.
+        template: Name of the job every node job extends.
+        includes: Local files included by the pipeline, e.g. defining the template.
+    """
+    needs = transitive_reduction(graph.triggered_dependencies())
+    names = {node: _job_name(node) for node in needs}
+
+    pipeline: dict = {}
+    if includes:
+        pipeline["include"] = [{"local": path} for path in includes]
+    for node in graph.nodes:
+        if node not in needs:
+            continue
+        pipeline[names[node]] = {
+            "extends": template,
+            "variables": {"GCD_NODE": node},
+            "needs": [names[dep] for dep in sorted(needs[node])],
+        }
+    if not needs:
+        # a child pipeline needs at least one job
+        pipeline["no-triggered-nodes"] = {"script": ["echo 'No triggered nodes'"]}
+    sys.stdout.write(yaml.safe_dump(pipeline, sort_keys=False, width=float("inf")))
+
+
+def _job_name(node: str) -> str:
+    """Return the job name of a node, avoiding hidden jobs and pipeline keywords."""
+    if node.startswith(".") or node in GITLAB_KEYWORDS:
+        return f"deploy {node}"
+    return node
+
+
+def render_schedule(plan: Schedule, fmt: Literal["table", "json"] = "table") -> None:
+    """
+    Render a duration-aware deployment plan to either a rich table (default) or JSON.
+
+    Args:
+        plan: The schedule computed for the triggered nodes.
+        fmt: Output format ("table" or "json").
+    """
+    if fmt == "json":
+        print(json.dumps({**plan.model_dump(), "saved": plan.saved}))
+        return
+
+    console = Console()
+
+    console.print("\n[bold]Deployment Schedule[/bold]")
+    if plan.nodes:
+        t = Table(show_header=True, header_style="bold cyan")
         t.add_column("Node", style="magenta")
-        t.add_column("File", style="green")
-        t.add_column("Pattern", style="yellow")
-
-        for n in triggered:
-            node = graph.nodes[n]
-            files = sorted({t["file"] for t in node.triggered_by})
-            patterns = sorted({t["pattern"] for t in node.triggered_by})
-            t.add_row(node.name, "\n".join(files), "\n".join(patterns))
+        t.add_column("Start", justify="right")
+        t.add_column("Finish", justify="right")
+        t.add_column("Slot", justify="right")
+        t.add_column("Waits for", style="green")
+
+        for node in plan.nodes:
+            name = f"[bold]{node.name}[/bold] *" if node.critical else node.name
+            t.add_row(
+                name,
+                f"{node.start:.1f}s",
+                f"{node.finish:.1f}s",
+                str(node.slot + 1),
+                "\n".join(node.depends_on),
+            )
         console.print(t)
     else:
         console.print("[dim](none)[/dim]")
 
-    if cycles:
-        console.print("\n[red]Dependency cycles detected:[/red]")
-        for c in cycles:
-            console.print(" → ".join(c))
-
-    console.print("\n[bold]Deployment Stages[/bold]")
-    for i, stage in enumerate(stages, 1):
-        console.print(
-            f"  Stage {i}: {', '.join(stage)}"  # pylint: disable=inconsistent-quotes
-        )
+    console.print(f"\n[bold]Critical path[/bold]: {' → '.join(plan.critical_path) or '(none)'}")
+    console.print(f"  Predicted total: {plan.makespan:.1f}s")
+    console.print(f"  Staged plan:     {plan.staged_makespan:.1f}s")
+    console.print(f"  Saved:           {plan.saved:.1f}s")
+
+
+def render_execution(report: ExecutionReport, fmt: Literal["table", "json"] = "table") -> None:
+    """
+    Render the outcome of an execution to either a rich table (default) or JSON.
+
+    Args:
+        report: The execution report of the triggered nodes.
+        fmt: Output format ("table" or "json").
+    """
+    if fmt == "json":
+        print(json.dumps({**report.model_dump(), "saved": report.saved}))
+        return
+
+    console = Console()
+
+    console.print("\n[bold]Execution Summary[/bold]")
+    if report.runs:
+        styles = {"success": "green", "failed": "red", "skipped": "dim", "cancelled": "yellow"}
+        t = Table(show_header=True, header_style="bold cyan")
+        t.add_column("Node", style="magenta")
+        t.add_column("Status")
+        t.add_column("Exit code", justify="right")
+        t.add_column("Duration", justify="right")
+
+        for run in report.runs:
+            t.add_row(
+                run.name,
+                f"[{styles[run.status]}]{run.status}[/{styles[run.status]}]",
+                "" if run.returncode is None else str(run.returncode),
+                f"{run.duration:.1f}s",
+            )
+        console.print(t)
+    else:
+        console.print("[dim](none)[/dim]")
+
+    console.print(f"  Wall time:             {report.wall_time:.1f}s")
+    console.print(f"  Stage-barrier time:    {report.staged_time:.1f}s")
+    console.print(f"  Saved:                 {report.saved:.1f}s")
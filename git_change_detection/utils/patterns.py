@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import os
+import posixpath
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from git_change_detection.models.node_metadata import NodeMetadata
+
+GLOBSTAR = "**"
+
+
+def translate_segment(segment: str) -> str:
+    """
+    Translate a single path segment glob into a regular expression.
+
+    Supports ``*`` and ``?`` (never crossing ``/``), character classes such as
+    ``[a-z]`` or ``[!0-9]``, and backslash escapes.
+    """
+    i, n = 0, len(segment)
+    out = []
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == "*":
+            while i < n and segment[i] == "*":
+                i += 1
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i < n:
+            out.append(re.escape(segment[i]))
+            i += 1
+        elif c == "[":
+            j = i
+            if j < n and segment[j] in "!^":
+                j += 1
+            if j < n and segment[j] == "]":
+                j += 1
+            while j < n and segment[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+                continue
+            body = segment[i:j].replace("\\", "\\\\")
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def is_literal(segment: str) -> bool:
+    """Return whether a segment contains no glob syntax."""
+    return not any(c in segment for c in "*?[\\")
+
+
+def literal_prefix(pattern: str) -> str:
+    """Return the part of a pattern before its first glob syntax."""
+    for i, c in enumerate(pattern):
+        if c in "*?[\\":
+            return pattern[:i]
+    return pattern
+
+
+def split_glob(pattern: str) -> list[str]:
+    """
+    Split a glob into its path segments, collapsing repeated ``**``.
+
+    A trailing ``**`` only matches *inside* a directory, like gitignore, so it
+    is expanded into a mandatory segment followed by ``**``.
+    """
+    segments: list[str] = []
+    for segment in pattern.strip("/").split("/"):
+        if not segment or (segment == GLOBSTAR and segments and segments[-1] == GLOBSTAR):
+            continue
+        segments.append(segment)
+    if segments and segments[-1] == GLOBSTAR:
+        segments[-1:] = ["*", GLOBSTAR]
+    return segments
+
+
+class GlobState:
+    """A single NFA state; ``loops`` marks ``**`` states consuming any segment."""
+
+    __slots__ = ("accepts", "globstar", "literal", "loops", "wildcard")
+
+    def __init__(self, loops: bool = False) -> None:
+        self.literal: dict[str, int] = {}
+        self.wildcard: dict[str, tuple[re.Pattern[str], int]] = {}
+        self.globstar: int | None = None
+        self.loops = loops
+        self.accepts: list[tuple[str, str, bool]] = []
+
+
+class GlobAutomaton:
+    """
+    Combined automaton matching paths against many segment-aware globs at once.
+
+    Patterns are compiled into a shared NFA over path segments; state sets are
+    interned and their transitions memoised, so the automaton behaves like a
+    lazily built DFA. Walking sorted paths lets directories shared between
+    consecutive paths be evaluated once, and a directory leading to no live
+    state prunes its whole subtree.
+    """
+
+    def __init__(self) -> None:
+        self._states: list[GlobState] = [GlobState()]
+        self._sets: dict[frozenset[int], int] = {}
+        self._set_members: list[frozenset[int]] = []
+        self._steps: dict[tuple[int, str], int] = {}
+        self._start: int | None = None
+        self._accepting: dict[str, set[int]] = {}
+        self.steps = 0
+
+    def __len__(self) -> int:
+        return sum(len(state.accepts) for state in self._states)
+
+    @property
+    def states(self) -> list[GlobState]:
+        """The NFA states, the start state first."""
+        return self._states
+
+    @classmethod
+    def from_states(cls, states: list[GlobState]) -> GlobAutomaton:
+        """Rebuild an automaton from the states of another one."""
+        automaton = cls()
+        automaton._states = states
+        for i, state in enumerate(states):
+            for node, _, _ in state.accepts:
+                automaton._accepting.setdefault(node, set()).add(i)
+        return automaton
+
+    def add(self, pattern: str, node: str, label: str, negated: bool = False) -> None:
+        """
+        Add a glob to the automaton.
+
+        Args:
+            pattern: Glob to match full paths against.
+            node: Node triggered by the glob.
+            label: Pattern reported for matches.
+            negated: Whether matching paths must *not* trigger the node.
+        """
+        current = 0
+        for segment in split_glob(pattern):
+            state = self._states[current]
+            if segment == GLOBSTAR:
+                if state.globstar is None:
+                    state.globstar = self._new_state(loops=True)
+                current = state.globstar
+            elif is_literal(segment):
+                if segment not in state.literal:
+                    state.literal[segment] = self._new_state()
+                current = state.literal[segment]
+            else:
+                if segment not in state.wildcard:
+                    regex = re.compile(translate_segment(segment))
+                    state.wildcard[segment] = (regex, self._new_state())
+                current = state.wildcard[segment][1]
+        self._states[current].accepts.append((node, label, negated))
+        self._accepting.setdefault(node, set()).add(current)
+        # the structure changed, previously memoised transitions are stale
+        self._sets.clear()
+        self._set_members.clear()
+        self._steps.clear()
+        self._start = None
+
+    def remove(self, node: str) -> None:
+        """
+        Remove every glob of a node.
+
+        Only accepting entries are dropped: transitions are left in place, so
+        the memoised state sets stay valid.
+        """
+        for s in self._accepting.pop(node, ()):
+            state = self._states[s]
+            state.accepts = [accept for accept in state.accepts if accept[0] != node]
+
+    def _new_state(self, loops: bool = False) -> int:
+        self._states.append(GlobState(loops=loops))
+        return len(self._states) - 1
+
+    def _intern(self, states: set[int]) -> int:
+        pending = list(states)
+        while pending:
+            globstar = self._states[pending.pop()].globstar
+            if globstar is not None and globstar not in states:
+                states.add(globstar)
+                pending.append(globstar)
+        key = frozenset(states)
+        if key not in self._sets:
+            self._sets[key] = len(self._set_members)
+            self._set_members.append(key)
+        return self._sets[key]
+
+    @property
+    def start(self) -> int:
+        """Interned state set before any segment is consumed."""
+        if self._start is None:
+            self._start = self._intern({0})
+        return self._start
+
+    def step(self, current: int, segment: str) -> int:
+        """Consume one path segment from an interned state set."""
+        key = (current, segment)
+        cached = self._steps.get(key)
+        if cached is not None:
+            return cached
+        self.steps += 1
+        targets: set[int] = set()
+        for s in self._set_members[current]:
+            state = self._states[s]
+            if state.loops:
+                targets.add(s)
+            if segment in state.literal:
+                targets.add(state.literal[segment])
+            for regex, target in state.wildcard.values():
+                if regex.fullmatch(segment):
+                    targets.add(target)
+        result = self._intern(targets)
+        self._steps[key] = result
+        return result
+
+    def is_dead(self, current: int) -> bool:
+        """Return whether no path can match from this state set."""
+        return not self._set_members[current]
+
+    def accepts(self, current: int) -> Iterator[tuple[str, str, bool]]:
+        """Yield the (node, label, negated) accepted by an interned state set."""
+        for s in self._set_members[current]:
+            yield from self._states[s].accepts
+
+    def match_paths(self, paths: Iterable[str]) -> Iterator[tuple[str, int]]:
+        """
+        Walk paths in sorted order, yielding (path, final state set) for every
+        path that reached at least one accepting state.
+        """
+        prefix: list[str] = []
+        stack: list[int] = [self.start]
+        for path in sorted(paths):
+            segments = path.split("/")
+            common = 0
+            limit = min(len(prefix), len(segments) - 1)
+            while common < limit and prefix[common] == segments[common]:
+                common += 1
+            del prefix[common:]
+            del stack[common + 1 :]
+
+            current = stack[-1]
+            for segment in segments[common:-1]:
+                if self.is_dead(current):
+                    break
+                current = self.step(current, segment)
+                prefix.append(segment)
+                stack.append(current)
+            if self.is_dead(current):
+                continue
+            current = self.step(current, segments[-1])
+            if any(True for _ in self.accepts(current)):
+                yield path, current
+
+
+class TriggerIndex:
+    """
+    Precompiled trigger patterns of a set of nodes.
+
+    ``fnmatch`` patterns (the default dialect, where ``*`` crosses ``/``) are
+    translated to regular expressions, compiled on first use and only evaluated
+    against paths starting with their literal prefix. ``glob`` patterns are segment-aware,
+    support ``**`` and ``!`` negation, and are all compiled into a single
+    ``GlobAutomaton``.
+
+    Matching can run from several threads: the state it builds lazily (compiled
+    regular expressions, automaton state sets) is updated under a lock. Adding
+    or removing nodes must not run concurrently with matching.
+    """
+
+    def __init__(self) -> None:
+        # node -> (node, pattern, regular expression) of its fnmatch patterns
+        self._fnmatch: dict[str, list[tuple[str, str, str]]] = {}
+        self._fnmatch_prefixes: dict[str, list[tuple[str, str, str]]] | None = None
+        self._regexes: dict[str, re.Pattern[str]] = {}
+        self.automaton = GlobAutomaton()
+        self._order: dict[tuple[str, str], int] = {}
+        # node -> labels of its patterns, the keys of its entries in _order
+        self._labels: dict[str, list[str]] = {}
+        self._next_order = 0
+        self._prefixes: list[str] | None = None
+        self._prefix_set: frozenset[str] = frozenset()
+        self.evaluations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[NodeMetadata]) -> TriggerIndex:
+        """Compile the triggers of every node."""
+        index = cls()
+        for node in nodes:
+            index.add_node(node)
+        return index
+
+    @classmethod
+    def from_parts(
+        cls,
+        fnmatch_patterns: list[tuple[str, str, str]],
+        automaton: GlobAutomaton,
+        order: list[tuple[str, str]],
+    ) -> TriggerIndex:
+        """
+        Rebuild an index from its compiled patterns, in their original order.
+
+        Args:
+            fnmatch_patterns: (node, pattern, regular expression) of fnmatch patterns.
+            automaton: Automaton of the glob patterns.
+            order: (node, pattern) pairs, in the order matches are reported.
+        """
+        index = cls()
+        for entry in fnmatch_patterns:
+            index._fnmatch.setdefault(entry[0], []).append(entry)
+        index.automaton = automaton
+        index._order = {key: i for i, key in enumerate(order)}
+        for node, label in order:
+            index._labels.setdefault(node, []).append(label)
+        index._next_order = len(order)
+        return index
+
+    @property
+    def fnmatch_patterns(self) -> list[tuple[str, str, str]]:
+        """(node, pattern, regular expression) of the fnmatch patterns, node by node."""
+        return [entry for entries in self._fnmatch.values() for entry in entries]
+
+    @property
+    def order(self) -> list[tuple[str, str]]:
+        """The (node, pattern) pairs of the index, in the order matches are reported."""
+        return list(self._order)
+
+    def add_node(self, node: NodeMetadata) -> None:
+        """Compile the triggers of a single node."""
+        for prefix, patterns in node.triggers.items():
+            for pattern in patterns:
+                if node.syntax_of(prefix, pattern) == "glob":
+                    negated = pattern.startswith("!")
+                    full = posixpath.join(prefix, pattern[1:] if negated else pattern)
+                    label = f"!{full}" if negated else full
+                    self.automaton.add(full, node.name, label, negated)
+                else:
+                    full = os.path.join(prefix, pattern)
+                    label = full
+                    entry = (node.name, full, fnmatch.translate(os.path.normcase(full)))
+                    self._fnmatch.setdefault(node.name, []).append(entry)
+                    if self._fnmatch_prefixes is not None:
+                        prefix_key = literal_prefix(os.path.normcase(full))
+                        self._fnmatch_prefixes.setdefault(prefix_key, []).append(entry)
+                if (node.name, label) not in self._order:
+                    self._order[(node.name, label)] = self._next_order
+                    self._labels.setdefault(node.name, []).append(label)
+                    self._next_order += 1
+        self._prefixes = None
+
+    def remove_node(self, name: str) -> None:
+        """
+        Drop the compiled triggers of a node, so that it can be added again.
+
+        Only the entries of the node are visited, not every pattern of the index.
+        """
+        entries = self._fnmatch.pop(name, ())
+        if self._fnmatch_prefixes is not None:
+            for entry in entries:
+                prefix = literal_prefix(os.path.normcase(entry[1]))
+                group = self._fnmatch_prefixes[prefix]
+                group.remove(entry)
+                if not group:
+                    del self._fnmatch_prefixes[prefix]
+        self.automaton.remove(name)
+        for label in self._labels.pop(name, ()):
+            del self._order[(name, label)]
+        self._prefixes = None
+
+    def may_match_within(self, directory: str) -> bool:
+        """
+        Return whether any trigger could match a path inside a directory, from
+        the literal prefixes of the patterns; used to prune tree walks.
+        """
+        with self._lock:
+            if self._prefixes is None:
+                self._prefix_set = frozenset(
+                    literal_prefix(os.path.normcase(label))
+                    for _, label in self._order
+                    if not label.startswith("!")
+                )
+                self._prefixes = sorted(self._prefix_set)
+            prefixes = self._prefixes
+        directory = os.path.normcase(directory).rstrip("/") + "/"
+        # a prefix of the directory, e.g. "src/" or "sr" for "src/app/"
+        if any(directory[:end] in self._prefix_set for end in range(len(directory) + 1)):
+            return True
+        # or a path below it, e.g. "src/app/lib/" for "src/"
+        i = bisect.bisect_left(prefixes, directory)
+        return i < len(prefixes) and prefixes[i].startswith(directory)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._fnmatch.values())) + len(self.automaton)
+
+    def _fnmatch_by_prefix(self) -> dict[str, list[tuple[str, str, str]]]:
+        """Group the fnmatch patterns by literal prefix."""
+        if self._fnmatch_prefixes is None:
+            self._fnmatch_prefixes = {}
+            for entry in self.fnmatch_patterns:
+                prefix = literal_prefix(os.path.normcase(entry[1]))
+                self._fnmatch_prefixes.setdefault(prefix, []).append(entry)
+        return self._fnmatch_prefixes
+
+    def _regex(self, source: str) -> re.Pattern[str]:
+        regex = self._regexes.get(source)
+        if regex is None:
+            regex = self._regexes[source] = re.compile(source)
+        return regex
+
+    def match(self, paths: Iterable[str]) -> Iterator[tuple[str, str, str]]:
+        """
+        Yield (path, node, pattern) for every trigger matching a changed path.
+
+        With the glob dialect, a node is triggered by a path matching at least
+        one of its patterns and none of its negated patterns.
+        """
+        paths = list(paths)
+        with self._lock:
+            matches = self._collect(paths)
+
+        for path in paths:
+            for node, pattern in sorted(set(matches.get(path, ())), key=self._order.__getitem__):
+                yield path, node, pattern
+
+    def _collect(self, paths: list[str]) -> dict[str, list[tuple[str, str]]]:
+        """Map every matched path to its (node, pattern) matches, in any order."""
+        matches: dict[str, list[tuple[str, str]]] = {}
+
+        if self._fnmatch:
+            by_prefix = self._fnmatch_by_prefix()
+            lengths = sorted({len(prefix) for prefix in by_prefix})
+            for path in paths:
+                normalized = os.path.normcase(path)
+                for length in lengths:
+                    if length > len(normalized):
+                        break
+                    for node, pattern, regex in by_prefix.get(normalized[:length], ()):
+                        self.evaluations += 1
+                        if self._regex(regex).match(normalized):
+                            matches.setdefault(path, []).append((node, pattern))
+
+        if len(self.automaton):
+            steps = self.automaton.steps
+            for path, state in self.automaton.match_paths(paths):
+                excluded = {node for node, _, negated in self.automaton.accepts(state) if negated}
+                for node, label, negated in self.automaton.accepts(state):
+                    if not negated and node not in excluded:
+                        matches.setdefault(path, []).append((node, label))
+            self.evaluations += self.automaton.steps - steps
+        return matches
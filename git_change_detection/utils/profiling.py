@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Literal
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of the current process, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profiler:
+    """Collects per-phase wall/CPU timings and counters for a single run."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.phases: list[dict[str, Any]] = []
+        self.counters: dict[str, int] = {}
+        self._origin = time.perf_counter()
+        self._cpu_origin = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a named phase."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                {
+                    "name": name,
+                    "start": wall_start - self._origin,
+                    "wall": time.perf_counter() - wall_start,
+                    "cpu": time.process_time() - cpu_start,
+                }
+            )
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a named counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> dict[str, Any]:
+        """Return the collected timings and counters as a JSON-serialisable dict."""
+        return {
+            "phases": self.phases,
+            "counters": self.counters,
+            "total_wall": time.perf_counter() - self._origin,
+            "total_cpu": time.process_time() - self._cpu_origin,
+            "peak_rss": peak_rss_bytes(),
+        }
+
+    def trace_events(self) -> dict[str, Any]:
+        """Return the collected data in the Chrome trace-event format."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events: list[dict[str, Any]] = [
+            {
+                "name": p["name"],
+                "ph": "X",
+                "ts": p["start"] * 1e6,
+                "dur": p["wall"] * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {"cpu_ms": p["cpu"] * 1e3},
+            }
+            for p in self.phases
+        ]
+        end = max((p["start"] + p["wall"] for p in self.phases), default=0.0)
+        counters: dict[str, Any] = dict(self.counters)
+        rss = peak_rss_bytes()
+        if rss is not None:
+            counters["peak_rss"] = rss
+        events.append(
+            {"name": "counters", "ph": "C", "ts": end * 1e6, "pid": pid, "args": counters}
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path, fmt: Literal["json", "trace"] = "json") -> None:
+        """Write the profile to a file, as a JSON report or a Chrome trace."""
+        data = self.trace_events() if fmt == "trace" else self.report()
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is disabled; every call is a no-op."""
+
+    enabled = False
+    _context = nullcontext()
+
+    def phase(self, name: str) -> nullcontext:
+        """Return a context manager timing nothing."""
+        return self._context
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Ignore a counter increment."""
+
+
+NULL_PROFILER = NullProfiler()
+
+
+@contextmanager
+def profiling(
+    path: Path | None, fmt: Literal["json", "trace"] = "json"
+) -> Iterator[Profiler | NullProfiler]:
+    """
+    Provide a profiler for a run, writing its report to ``path`` on exit.
+
+    When ``path`` is None the no-op profiler is yielded, so disabled profiling
+    costs nothing beyond a few empty calls per phase.
+    """
+    if path is None:
+        yield NULL_PROFILER
+        return
+    profiler = Profiler()
+    try:
+        yield profiler
+    finally:
+        profiler.write(path, fmt)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Mapping
+
+
+def topological_order(predecessors: Mapping[str, set[str]]) -> list[str]:
+    """
+    Return the nodes of a DAG in dependency order (Kahn's algorithm).
+
+    Args:
+        predecessors: Mapping of node -> nodes that must complete before it.
+
+    Returns:
+        Nodes ordered so that every node appears after all its predecessors.
+        Ties are broken alphabetically to keep results deterministic.
+    """
+    indegree = {node: len(preds) for node, preds in predecessors.items()}
+    successors: dict[str, list[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    ready = [node for node, deg in indegree.items() if deg == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = heapq.heappop(ready)
+        order.append(node)
+        for succ in successors[node]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                heapq.heappush(ready, succ)
+
+    if len(order) != len(predecessors):
+        raise RuntimeError("Dependency resolution failed (possible cycle).")
+    return order
+
+
+def bottom_levels(
+    predecessors: Mapping[str, set[str]], durations: Mapping[str, float]
+) -> dict[str, float]:
+    """
+    Compute the bottom level of every node: the longest duration-weighted path
+    from the node (inclusive) to any sink of the DAG.
+    """
+    successors: dict[str, list[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    levels: dict[str, float] = {}
+    for node in reversed(topological_order(predecessors)):
+        tail = max((levels[s] for s in successors[node]), default=0.0)
+        levels[node] = durations[node] + tail
+    return levels
+
+
+def critical_path(
+    predecessors: Mapping[str, set[str]], durations: Mapping[str, float]
+) -> list[str]:
+    """Return the longest duration-weighted dependency chain, in execution order."""
+    if not predecessors:
+        return []
+    levels = bottom_levels(predecessors, durations)
+    successors: dict[str, list[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    roots = [node for node, preds in predecessors.items() if not preds]
+    node = max(sorted(roots), key=lambda n: levels[n])
+    path = [node]
+    while successors[node]:
+        node = max(sorted(successors[node]), key=lambda n: levels[n])
+        path.append(node)
+    return path
+
+
+def list_schedule(
+    predecessors: Mapping[str, set[str]],
+    durations: Mapping[str, float],
+    max_parallel: int | None = None,
+) -> dict[str, tuple[float, float, int]]:
+    """
+    Schedule a DAG of jobs on a bounded pool of workers.
+
+    Ready jobs are dispatched as soon as a worker is free, highest bottom level
+    first (critical-path list scheduling), which keeps the longest remaining
+    chain moving and approximates the minimal makespan.
+
+    Args:
+        predecessors: Mapping of node -> nodes that must complete before it.
+        durations: Expected duration of every node, in seconds.
+        max_parallel: Maximum number of concurrent jobs (None or 0 for unlimited).
+
+    Returns:
+        Mapping of node -> (start, finish, worker slot).
+    """
+    if not predecessors:
+        return {}
+
+    levels = bottom_levels(predecessors, durations)
+    remaining = {node: len(preds) for node, preds in predecessors.items()}
+    successors: dict[str, list[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    workers = max_parallel or len(predecessors)
+    free_slots = list(range(workers))
+    heapq.heapify(free_slots)
+
+    ready: list[tuple[float, str]] = [(-levels[n], n) for n, deg in remaining.items() if deg == 0]
+    heapq.heapify(ready)
+    running: list[tuple[float, str, int]] = []
+    result: dict[str, tuple[float, float, int]] = {}
+    now = 0.0
+
+    while ready or running:
+        while ready and free_slots:
+            _, node = heapq.heappop(ready)
+            slot = heapq.heappop(free_slots)
+            finish = now + durations[node]
+            result[node] = (now, finish, slot)
+            heapq.heappush(running, (finish, node, slot))
+
+        now, node, slot = heapq.heappop(running)
+        heapq.heappush(free_slots, slot)
+        for succ in successors[node]:
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                heapq.heappush(ready, (-levels[succ], succ))
+
+    return result
+
+
+def staged_makespan(
+    stages: list[list[str]],
+    durations: Mapping[str, float],
+    max_parallel: int | None = None,
+) -> float:
+    """
+    Predict the total time of a stage-barrier plan, where every stage starts
+    only once the previous one has fully completed.
+    """
+    total = 0.0
+    for stage in stages:
+        schedule = list_schedule({node: set() for node in stage}, durations, max_parallel)
+        total += max((finish for _, finish, _ in schedule.values()), default=0.0)
+    return total
+
+
+def transitive_reduction(predecessors: Mapping[str, set[str]]) -> dict[str, set[str]]:
+    """
+    Drop every dependency implied by another one: a node only keeps the
+    predecessors no other predecessor of it already depends on, directly or not.
+
+    Ancestor sets are kept as bitsets (Python integers) built in dependency
+    order, so thousands of nodes are reduced in a few word operations per edge.
+
+    Args:
+        predecessors: Mapping of node -> nodes that must complete before it.
+
+    Returns:
+        Mapping of node -> its predecessors not reachable through another one.
+    """
+    order = topological_order(predecessors)
+    bits = {node: 1 << i for i, node in enumerate(order)}
+    ancestors: dict[str, int] = {}
+    reduced: dict[str, set[str]] = {}
+    for node in order:
+        preds = predecessors[node]
+        implied = 0
+        for pred in preds:
+            implied |= ancestors[pred]
+        reduced[node] = {pred for pred in preds if not implied & bits[pred]}
+        for pred in preds:
+            implied |= bits[pred]
+        ancestors[node] = implied
+    return reduced
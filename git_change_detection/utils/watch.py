@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from git import BadName, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+# inotify(7) event flags
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")
+# directories never watched
+SKIPPED_DIRS = {".git"}
+
+
+def _walk(top: Path):
+    """Walk a working tree, skipping git directories and nested repositories."""
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [
+            d
+            for d in dirnames
+            if d not in SKIPPED_DIRS and not os.path.lexists(os.path.join(dirpath, d, ".git"))
+        ]
+        yield dirpath, dirnames, filenames
+
+
+class InotifyWatcher:
+    """
+    Reports paths changed under a directory tree, using Linux inotify.
+
+    Every directory is watched individually; directories created later are
+    watched as they appear. Paths are reported relative to the root, and
+    directories moved or created as a whole are reported as directories.
+    """
+
+    def __init__(self, root: Path, debounce: float = 0.05) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self.root = Path(root)
+        self.debounce = debounce
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, str] = {}
+        self._watch_tree("")
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def _watch_tree(self, relative: str) -> None:
+        for dirpath, _, _ in _walk(self.root / relative):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue
+                raise OSError(err, f"Cannot watch {dirpath}: {os.strerror(err)}")
+            path = os.path.relpath(dirpath, self.root)
+            self._dirs[wd] = "" if path == "." else path.replace(os.sep, "/")
+
+    def read(self, timeout: float | None = None) -> set[str] | None:
+        """
+        Wait for changes and return the changed paths, or None when events were
+        lost and every path must be checked again.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[str] = set()
+        overflow = False
+        while ready:
+            overflow |= self._drain(changed)
+            # let bursts of events (checkouts, formatters) settle into one batch
+            ready, _, _ = select.select([self._fd], [], [], self.debounce)
+        return None if overflow else changed
+
+    def _drain(self, changed: set[str]) -> bool:
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return overflow
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name or (mask & IN_ISDIR and name in SKIPPED_DIRS):
+                    continue
+                path = f"{directory}/{name}" if directory else name
+                changed.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+
+
+class PollingWatcher:
+    """
+    Reports paths changed under a directory tree by comparing file stats at a
+    fixed interval; the fallback where inotify is not available.
+    """
+
+    def __init__(self, root: Path, interval: float = 1.0) -> None:
+        self.root = Path(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for dirpath, _, filenames in _walk(self.root):
+            relative = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            for name in filenames:
+                path = name if relative == "." else f"{relative}/{name}"
+                try:
+                    st = os.lstat(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def read(self, timeout: float | None = None) -> set[str] | None:
+        """Wait one interval (at most ``timeout``) and return the changed paths."""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        return {
+            path
+            for path in previous.keys() | snapshot.keys()
+            if previous.get(path) != snapshot.get(path)
+        }
+
+
+def open_watcher(root: Path, polling: bool = False) -> InotifyWatcher | PollingWatcher:
+    """Watch a directory tree with inotify, or by polling when unavailable or requested."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except OSError:
+            pass
+    return PollingWatcher(root)
+
+
+def blob_id(path: Path) -> str:
+    """Return the id git would give to the content of a file (or symlink)."""
+    data = os.fsencode(os.readlink(path)) if path.is_symlink() else path.read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class WorktreeChanges:
+    """
+    Files of a working tree differing from a base commit, updated path by path.
+
+    The full comparison is done once; afterwards only the reported paths are
+    compared with the base tree, from their blob ids. Untracked files ignored
+    by git are left out.
+    """
+
+    def __init__(self, base_commit: str, repo_path: Path | None = None) -> None:
+        repo_path = Path(repo_path or Path.cwd())
+        try:
+            self.repo = Repo(repo_path, search_parent_directories=True)
+        except (InvalidGitRepositoryError, NoSuchPathError) as e:
+            raise RuntimeError(f"{repo_path} is not a valid Git repository.") from e
+        try:
+            self.base = self.repo.commit(base_commit)
+        except (BadName, ValueError) as e:
+            raise RuntimeError(f"Commit '{base_commit}' not found in repository.") from e
+        self.root = Path(self.repo.working_tree_dir or repo_path)
+        self.changed: set[str] = set()
+        self.rescan()
+
+    def rescan(self) -> tuple[set[str], set[str]]:
+        """Compare the whole working tree with the base commit."""
+        changed = set(self.repo.untracked_files)
+        for d in self.base.diff(None):
+            changed.update(p for p in (d.a_path, d.b_path) if p)
+        changed = {path for path in changed if self._differs(path)}
+        added, removed = changed - self.changed, self.changed - changed
+        self.changed = changed
+        return added, removed
+
+    def refresh(self, paths: set[str]) -> tuple[set[str], set[str]]:
+        """
+        Compare reported paths with the base commit; directories are expanded
+        to every file below them, in the working tree and in the base tree.
+
+        Returns:
+            Paths that started to differ, and paths back to their base content.
+        """
+        candidates: set[str] = set()
+        for path in paths:
+            candidates.add(path)
+            prefix = path.rstrip("/") + "/"
+            candidates.update(p for p in self.changed if p.startswith(prefix))
+            local = self.root / path
+            if local.is_dir() and not local.is_symlink():
+                for dirpath, _, filenames in _walk(local):
+                    relative = Path(dirpath).relative_to(self.root).as_posix()
+                    candidates.update(f"{relative}/{name}" for name in filenames)
+            base = self._base_entry(path)
+            if base is not None and base.type == "tree":
+                candidates.update(item.path for item in base.traverse() if item.type != "tree")
+
+        untracked = [p for p in candidates if self._base_entry(p) is None]
+        ignored = set(self.repo.ignored(*untracked)) if untracked else set()
+
+        added, removed = set(), set()
+        for path in candidates:
+            if path not in ignored and self._differs(path):
+                if path not in self.changed:
+                    added.add(path)
+            elif path in self.changed:
+                removed.add(path)
+        self.changed = (self.changed | added) - removed
+        return added, removed
+
+    def _base_entry(self, path: str):
+        try:
+            return self.base.tree / path
+        except KeyError:
+            return None
+
+    def _differs(self, path: str) -> bool:
+        """Return whether a file differs from its content at the base commit."""
+        local = self.root / path
+        base = self._base_entry(path)
+        if base is not None and base.type == "submodule":
+            # only moving the submodule pointer changes the tree, not its files
+            return False
+        exists = local.is_symlink() or local.is_file()
+        if base is None or base.type == "tree":
+            return exists
+        if not exists:
+            return True
+        return blob_id(local) != base.hexsha
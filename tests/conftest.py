@@ -1,8 +1,87 @@
+import subprocess
+
 import pytest
+from git import Repo
+from hypothesis import strategies as st
 
+from git_change_detection.models.dependency_graph import DependencyGraph
 from git_change_detection.models.node_metadata import NodeMetadata
 
 
+def git(cwd, *args):
+    """Run a git command with a test identity."""
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def commit_files(repo_path, files, message="update"):
+    """Write files (deleting those set to None), commit them and return the commit."""
+    for name, content in files.items():
+        path = repo_path / name
+        if content is None:
+            path.unlink()
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    git(repo_path, "add", "-A")
+    git(repo_path, "commit", "-qm", message)
+    return Repo(repo_path).head.commit
+
+
+# hypothesis strategies of parsed metadata files, over a few shared node names
+NAMES = ["a", "b", "c", "d", "e"]
+
+node_details = st.fixed_dictionaries(
+    {},
+    optional={
+        "depends_on": st.lists(st.sampled_from(NAMES), max_size=3),
+        "triggers": st.dictionaries(
+            st.sampled_from(["src", "docs"]),
+            st.lists(st.sampled_from(["*.py", "*.md", "*", "**/*.py", "!*.md"]), max_size=2),
+            max_size=2,
+        ),
+        "pattern_syntax": st.sampled_from(["fnmatch", "glob"]),
+    },
+)
+metadata_files = st.fixed_dictionaries(
+    {},
+    optional={
+        "blacklist": st.lists(st.sampled_from(NAMES), max_size=2),
+        "pattern_syntax": st.sampled_from(["fnmatch", "glob"]),
+    },
+).flatmap(
+    lambda defaults: st.dictionaries(st.sampled_from(NAMES), node_details, max_size=4).map(
+        lambda nodes: {**nodes, **defaults}
+    )
+)
+
+
+def build(files):
+    """Merge metadata files into a new graph, as sources file0, file1, ..."""
+    g = DependencyGraph()
+    for i, data in enumerate(files):
+        g.deep_merge(data, source=f"file{i}")
+    return g
+
+
+def snapshot(graph):
+    """The nodes of a graph, in order, and its blacklist, for comparing graphs."""
+    return [(name, node.model_dump()) for name, node in graph.nodes.items()], graph.blacklist
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """An empty git repository."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    return path
+
+
 @pytest.fixture
 def simple_node():
     return NodeMetadata(name="node1")
@@ -0,0 +1,162 @@
+import subprocess
+import sys
+
+import pytest
+from conftest import build, metadata_files
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import git_change_detection
+from git_change_detection import DependencyGraph, Detector
+from git_change_detection.api import LiveDetection
+
+
+@pytest.fixture
+def graph():
+    g = DependencyGraph()
+    g.deep_merge(
+        {
+            "a": {"triggers": {"src": ["*.py"]}},
+            "b": {"depends_on": ["a", "missing"], "triggers": {"docs": ["*.md"]}},
+        }
+    )
+    return g
+
+
+def test_detector_detect_files(graph):
+    detector = Detector(graph)
+
+    result = detector.detect_files("a", "b", ["src/main.py", "docs/index.md"])
+
+    assert result.stages == [["a"], ["b"]]
+    assert result.cycles == []
+    assert result.triggered["a"].triggered_by == [{"file": "src/main.py", "pattern": "src/*.py"}]
+    assert result.triggered["b"].depends_on == ["a"]
+
+
+def test_detector_is_reusable(graph):
+    detector = Detector(graph)
+
+    first = detector.detect_files("a", "b", ["src/main.py"])
+    second = detector.detect_files("b", "c", ["docs/index.md"])
+
+    assert list(first.triggered) == ["a"]
+    assert list(second.triggered) == ["b"]
+    assert second.stages == [["b"]]
+    # the caller's graph is left untouched
+    assert not any(node.triggered for node in graph.nodes.values())
+    assert graph.nodes["b"].depends_on == ["a", "missing"]
+
+
+def test_detector_resolve_copies_triggered_nodes(graph):
+    detector = Detector(graph)
+
+    marked, cycles, stages = detector.resolve([("docs/index.md", "b", "docs/*.md")])
+
+    assert list(marked.nodes) == ["a", "b"]
+    assert marked.nodes["b"].depends_on == ["a"]
+    assert (cycles, stages) == ([], [["b"]])
+    assert detector.graph.nodes["b"].depends_on == ["a", "missing"]
+    assert not detector.graph.nodes["b"].triggered_by
+    # untriggered nodes are shared with the detector, not copied
+    assert marked.nodes["a"] is detector.graph.nodes["a"]
+
+
+def test_detector_resolve_after_reload(graph):
+    detector = Detector(graph)
+    detector.replace_source("extra", {"missing": {}})
+
+    marked, _, _ = detector.resolve([("src/main.py", "a", "src/*.py")])
+
+    assert list(marked.nodes) == ["a", "b", "missing"]
+    assert marked.nodes["b"].depends_on == ["a", "missing"]
+    assert not marked.nodes["b"].triggered
+
+
+def test_detector_cycles_skip_stages():
+    g = DependencyGraph()
+    g.deep_merge(
+        {
+            "a": {"depends_on": ["b"], "triggers": {"src": ["*"]}},
+            "b": {"depends_on": ["a"], "triggers": {"src": ["*"]}},
+        }
+    )
+
+    result = Detector(g).detect_files("a", "b", ["src/x"])
+
+    assert result.cycles
+    assert result.stages == []
+
+
+def test_detect(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+    changed = mocker.patch("git_change_detection.api.get_changed_files", return_value=["src/a.py"])
+
+    result = git_change_detection.detect(tmp_path, "a", "b", metadata=[metadata])
+
+    assert changed.call_args.args == ("a", "b", tmp_path, False)
+    assert result.changed_files == ["src/a.py"]
+    assert result.triggered["node1"].stage == 1
+
+
+def test_detect_requires_metadata_or_graph():
+    with pytest.raises(ValueError):
+        git_change_detection.detect(None, "a", "b")
+
+
+def test_api_does_not_import_cli_dependencies():
+    code = (
+        "import sys, git_change_detection; "
+        "assert 'typer' not in sys.modules and 'rich' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+CHANGED = ["src/a.py", "src/lib/b.py", "src/c.md", "docs/index.md", "docs/x/y.py", "README"]
+
+
+@settings(max_examples=150, deadline=None)
+@given(st.lists(metadata_files, min_size=1, max_size=4), st.data())
+def test_detector_replace_source_matches_fresh_detector(files, data):
+    i = data.draw(st.integers(0, len(files) - 1))
+    new = data.draw(metadata_files)
+    changed = data.draw(st.lists(st.sampled_from(CHANGED), unique=True))
+    detector = Detector(build(files))
+
+    detector.replace_source(f"file{i}", new)
+
+    fresh = Detector(build(files[:i] + [new] + files[i + 1 :]))
+    result = detector.detect_files("a", "b", changed)
+    expected = fresh.detect_files("a", "b", changed)
+    assert result == expected
+
+
+def test_detector_reload_file(tmp_path):
+    path = tmp_path / "metadata.yaml"
+    path.write_text("a:\n  triggers:\n    src: ['*.py']\n")
+    detector = Detector.from_files([path])
+
+    path.write_text("a:\n  triggers:\n    docs: ['*.md']\nb:\n  depends_on: [a]\n")
+    assert detector.reload_file(path) == {"a", "b"}
+
+    result = detector.detect_files("a", "b", ["src/main.py", "docs/index.md"])
+    assert list(result.triggered) == ["a"]
+    assert result.triggered["a"].triggered_by == [{"file": "docs/index.md", "pattern": "docs/*.md"}]
+
+
+def test_live_detection(graph, mocker):
+    detector = Detector(graph)
+    match = mocker.spy(detector.index, "match")
+    live = LiveDetection(detector, "HEAD", ["src/main.py"])
+
+    live.update(changed=["docs/index.md", "src/main.py"])
+    result = live.result()
+
+    assert result.changed_files == ["docs/index.md", "src/main.py"]
+    assert result.stages == [["a"], ["b"]]
+    # only the newly changed path was matched again
+    assert match.call_args.args[0] == ["docs/index.md"]
+
+    live.update(reverted=["src/main.py"])
+    assert live.result().stages == [["b"]]
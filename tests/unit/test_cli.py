@@ -1,6 +1,8 @@
 import json
 
 import pytest
+import yaml
+from conftest import commit_files
 from typer.testing import CliRunner
 
 from git_change_detection import cli
@@ -147,3 +149,469 @@ def test_validate_multiple_files(tmp_path):
 
     assert result.exit_code == 0
     assert "All validations passed" in result.stdout
+
+
+# --- schedule command tests ---
+
+
+def test_schedule_json_output(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "node1:\n  triggers:\n    src: ['*.py']\n"
+        "node2:\n  depends_on: [node1]\n  triggers:\n    src: ['*.py']"
+    )
+    durations = tmp_path / "durations.json"
+    durations.write_text(json.dumps({"node1": 5, "node2": 10}))
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(
+        cli.app, ["schedule", "a", "b", "-m", str(metadata), "-d", str(durations), "--json"]
+    )
+
+    assert result.exit_code == 0
+    data = json.loads(result.stdout)
+    assert data["makespan"] == 15.0
+    assert data["critical_path"] == ["node1", "node2"]
+
+
+def test_schedule_table_output(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(cli.app, ["schedule", "a", "b", "-m", str(metadata)])
+
+    assert result.exit_code == 0
+    assert "Deployment Schedule" in result.stdout
+    assert "Predicted total: 60.0s" in result.stdout
+
+
+# --- execute command tests ---
+
+
+@pytest.mark.parametrize("command, exit_code", [("echo deploying {node}", 0), ("false", 1)])
+def test_execute_command(mocker, tmp_path, command, exit_code):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(
+        cli.app,
+        ["execute", "a", "b", "-m", str(metadata), "-c", command, "--repo", str(tmp_path)],
+    )
+
+    assert result.exit_code == exit_code
+    assert "Execution Summary" in result.stdout
+    if exit_code == 0:
+        assert "[node1] deploying node1" in result.stderr
+
+
+# --- profiling tests ---
+
+
+def test_detect_profile(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py', '*.txt']")
+    profile = tmp_path / "profile.json"
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(
+        cli.app, ["detect", "a", "b", "-m", str(metadata), "--profile", str(profile)]
+    )
+
+    assert result.exit_code == 0
+    report = json.loads(profile.read_text())
+    assert {p["name"] for p in report["phases"]} >= {"load_metadata", "git_diff", "render"}
+    assert report["counters"]["pattern_evaluations"] == 2
+    assert report["counters"]["matches"] == 1
+
+
+def test_validate_profile_trace(tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+    profile = tmp_path / "trace.json"
+
+    result = runner.invoke(
+        cli.app,
+        ["validate", "-m", str(metadata), "--profile", str(profile), "--profile-format", "trace"],
+    )
+
+    assert result.exit_code == 0
+    events = json.loads(profile.read_text())["traceEvents"]
+    assert "detect_cycles" in {e["name"] for e in events}
+
+
+def test_validate_pattern_syntax(tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "pattern_syntax: glob\n"
+        "node1:\n  triggers:\n    src: ['**/*.py', '!**/test_*.py']\n"
+        "node2:\n  pattern_syntax: fnmatch\n  triggers:\n    src: ['*.py']"
+    )
+
+    result = runner.invoke(cli.app, ["validate", "-m", str(metadata)])
+
+    assert result.exit_code == 0
+    assert "All validations passed" in result.stdout
+
+
+# --- multi-repository tests ---
+
+
+def test_detect_multiple_repositories(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "infra:\n  triggers:\n    terraform: ['*.tf']\n"
+        "app:\n  repository: apps\n  depends_on: [infra]\n  triggers:\n    src: ['*.py']"
+    )
+
+    many = mocker.patch(
+        "git_change_detection.cli.get_changed_files_many",
+        return_value={None: ["terraform/main.tf"], "apps": ["src/foo.py"]},
+    )
+    result = runner.invoke(
+        cli.app,
+        [
+            "detect",
+            "a",
+            "b",
+            "-m",
+            str(metadata),
+            "--repository",
+            f"apps={tmp_path}",
+            "--range",
+            "apps=v1..v2",
+            "--json",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert many.call_args.args[0]["apps"] == ("v1", "v2", tmp_path)
+    data = json.loads(result.stdout)
+    assert data["app"]["triggered_by"] == [{"file": "apps:src/foo.py", "pattern": "src/*.py"}]
+    assert data["infra"]["stage"] == 1
+    assert data["app"]["stage"] == 2
+
+
+def test_detect_reports_repositories_not_diffed(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "infra:\n  triggers:\n    src: ['*.py']\n"
+        "app:\n  repository: apps\n  triggers:\n    src: ['*.py']"
+    )
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(metadata), "--json"])
+
+    assert result.exit_code == 0
+    assert "no --repository given for apps" in result.stderr
+    data = json.loads(result.stdout)
+    assert data["infra"]["triggered"]
+    assert not data["app"]["triggered"]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--repository", "apps"],
+        ["--range", "apps=v1"],
+        ["--repository", "apps=/tmp"],
+    ],
+)
+def test_detect_multiple_repositories_bad_options(tmp_path, args):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(metadata), *args])
+
+    assert result.exit_code == 2
+
+
+# --- merge-base tests ---
+
+
+@pytest.mark.parametrize("positional, expected_last", [([], "HEAD"), (["feature"], "feature")])
+def test_detect_merge_base(mocker, tmp_path, positional, expected_last):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    resolve = mocker.patch("git_change_detection.cli.resolve_merge_base", return_value="abc123")
+    changed = mocker.patch(
+        "git_change_detection.cli.get_changed_files", return_value=["src/foo.py"]
+    )
+    result = runner.invoke(
+        cli.app,
+        [
+            "detect",
+            *positional,
+            "-m",
+            str(metadata),
+            "--merge-base",
+            "origin/main",
+            "--deepen",
+            "8",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert resolve.call_args.args == ("origin/main", expected_last, None, "origin", 8)
+    assert changed.call_args.args[:2] == ("abc123", expected_last)
+
+
+@pytest.mark.parametrize("args", [["a"], ["a", "b", "--merge-base", "main"]])
+def test_detect_commit_arguments(tmp_path, args):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(cli.app, ["detect", *args, "-m", str(metadata)])
+
+    assert result.exit_code == 2
+
+
+# --- deploy state tests ---
+
+
+def test_detect_since_last_deploy(tmp_path, git_repo):
+    repo = git_repo
+    commit_files(repo, {"src/main.py": "main", "docs/index.md": "docs"}, "initial")
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("app:\n  triggers:\n    src: ['*.py']\ndocs:\n  triggers:\n    docs: ['*']")
+    state = tmp_path / "state.db"
+    detect = ["detect", "-m", str(metadata), "--repo", str(repo), "--state", str(state), "--json"]
+
+    result = runner.invoke(cli.app, detect)
+    assert result.exit_code == 0
+    assert {n for n, node in json.loads(result.stdout).items() if node["triggered"]} == {
+        "app",
+        "docs",
+    }
+
+    result = runner.invoke(
+        cli.app, ["record", "-m", str(metadata), "--repo", str(repo), "--state", str(state)]
+    )
+    assert result.exit_code == 0
+    assert "Recorded 2 deployed nodes" in result.stdout
+
+    commit_files(repo, {"docs/index.md": "changed"}, "docs")
+    result = runner.invoke(cli.app, detect)
+    nodes = json.loads(result.stdout)
+    assert [n for n, node in nodes.items() if node["triggered"]] == ["docs"]
+    assert nodes["docs"]["deploy_reason"] == "inputs changed"
+    assert nodes["docs"]["triggered_by"] == []
+    assert nodes["docs"]["match_counts"] == {}
+
+    # the previous commit still matches the recorded deployment
+    result = runner.invoke(cli.app, [*detect, "HEAD~1"])
+    assert not any(node["triggered"] for node in json.loads(result.stdout).values())
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["a", "b"],
+        ["--merge-base", "main"],
+        ["-r", "infra=/tmp/infra", "--range", "infra=a..b"],
+    ],
+)
+def test_detect_state_bad_options(tmp_path, args):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(
+        cli.app, ["detect", *args, "-m", str(metadata), "--state", str(tmp_path / "state.db")]
+    )
+
+    assert result.exit_code == 2
+
+
+def test_record_unknown_node(tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(
+        cli.app,
+        ["record", "-m", str(metadata), "--state", str(tmp_path / "state.db"), "-n", "other"],
+    )
+
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("args, causes", [([], 20), (["--all-causes"], 50)])
+def test_detect_all_causes(mocker, tmp_path, args, causes):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+    mocker.patch(
+        "git_change_detection.cli.get_changed_files",
+        return_value=[f"src/file{i}.py" for i in range(50)],
+    )
+
+    result = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(metadata), "--json", *args])
+
+    node = json.loads(result.stdout)["node1"]
+    assert len(node["triggered_by"]) == causes
+    assert node["matched_files"] == 50
+
+
+# --- watch tests ---
+
+
+def test_watch(mocker, git_repo):
+    repo = git_repo
+    metadata = repo / "meta.yaml"
+    commit_files(
+        repo, {"src/main.py": "main", "meta.yaml": "app:\n  triggers:\n    src: ['*.py']\n"}
+    )
+
+    def edits():
+        (repo / "src" / "main.py").write_text("changed")
+        yield {"src/main.py"}
+        metadata.write_text("app:\n  triggers:\n    docs: ['*']\n")
+        yield {"meta.yaml"}
+        raise KeyboardInterrupt
+
+    batches = edits()
+    watcher = mocker.patch("git_change_detection.cli.open_watcher").return_value
+    watcher.read.side_effect = lambda: next(batches)
+
+    result = runner.invoke(
+        cli.app, ["watch", "-m", str(metadata), "--repo", str(repo), "--format", "json"]
+    )
+
+    assert result.exit_code == 0
+    reports = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [list(report) for report in reports] == [["app"]] * 3
+    assert [report["app"]["triggered"] for report in reports] == [False, True, False]
+    watcher.close.assert_called_once()
+
+
+# --- compile tests ---
+
+
+def test_compile_and_detect_compiled(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "a:\n  triggers:\n    src: ['*.py']\nb:\n  depends_on: [a]\n  triggers:\n    docs: ['*']"
+    )
+    artifact = tmp_path / "metadata.gcdc"
+
+    result = runner.invoke(cli.app, ["compile", "-m", str(metadata), "-o", str(artifact)])
+    assert result.exit_code == 0
+    assert "Compiled 2 nodes" in result.stdout
+
+    mocker.patch(
+        "git_change_detection.cli.get_changed_files", return_value=["src/x.py", "docs/y.md"]
+    )
+    compiled = runner.invoke(cli.app, ["detect", "a", "b", "--compiled", str(artifact), "--json"])
+    parsed = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(metadata), "--json"])
+
+    assert compiled.exit_code == 0
+    assert json.loads(compiled.stdout) == json.loads(parsed.stdout)
+    assert json.loads(compiled.stdout)["b"]["stage"] == 2
+
+
+def test_compile_invalid_metadata(tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("a:\n  depends_on: [missing]")
+    artifact = tmp_path / "metadata.gcdc"
+
+    result = runner.invoke(cli.app, ["compile", "-m", str(metadata), "-o", str(artifact)])
+
+    assert result.exit_code == 1
+    assert not artifact.exists()
+
+
+def test_detect_compiled_invalid(tmp_path):
+    artifact = tmp_path / "metadata.gcdc"
+    artifact.write_bytes(b"not an artifact")
+
+    result = runner.invoke(cli.app, ["detect", "a", "b", "--compiled", str(artifact)])
+
+    assert result.exit_code == 1
+    assert "not a compiled artifact" in result.stdout
+
+
+def test_detect_metadata_and_compiled(tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("a:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(
+        cli.app, ["detect", "a", "b", "-m", str(metadata), "--compiled", str(metadata)]
+    )
+
+    assert result.exit_code == 2
+
+
+# --- gitlab pipeline tests ---
+
+
+def test_detect_gitlab_pipeline(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text(
+        "a:\n  triggers:\n    src: ['*']\n"
+        "b:\n  depends_on: [a]\n  triggers:\n    src: ['*']\n"
+        "c:\n  depends_on: [a, b]\n  triggers:\n    src: ['*']"
+    )
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(
+        cli.app,
+        ["detect", "a", "b", "-m", str(metadata), "--format", "gitlab", "--job-template", ".x"],
+    )
+
+    assert result.exit_code == 0
+    pipeline = yaml.safe_load(result.stdout)
+    assert {name: job["needs"] for name, job in pipeline.items()} == {
+        "a": [],
+        "b": ["a"],
+        "c": ["b"],
+    }
+    assert pipeline["c"]["extends"] == ".x"
+
+
+@pytest.mark.parametrize("output_format", ["table", "plain", "gitlab"])
+def test_detect_json_conflicts_with_format(tmp_path, output_format):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    result = runner.invoke(
+        cli.app, ["detect", "a", "b", "-m", str(metadata), "--json", "--format", output_format]
+    )
+
+    assert result.exit_code == 2
+    assert "cannot be combined" in result.output
+
+
+def test_detect_json_with_format_json(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("node1:\n  triggers:\n    src: ['*.py']")
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(
+        cli.app, ["detect", "a", "b", "-m", str(metadata), "--json", "--format", "json"]
+    )
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["node1"]["triggered"]
+
+
+def test_detect_gitlab_pipeline_cycle(mocker, tmp_path):
+    metadata = tmp_path / "meta.yaml"
+    metadata.write_text("a:\n  depends_on: [b]\n  triggers:\n    src: ['*']\nb:\n  depends_on: [a]")
+
+    mocker.patch("git_change_detection.cli.get_changed_files", return_value=["src/foo.py"])
+    result = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(metadata), "--format", "gitlab"])
+
+    assert result.exit_code == 1
+    assert "cycles detected" in result.stdout
+
+
+def test_detect_conflicting_repositories(tmp_path):
+    infra = tmp_path / "infra.yml"
+    infra.write_text("repository: infra\ndeploy.yml:\n  triggers:\n    infra: ['*']")
+    apps = tmp_path / "apps.yml"
+    apps.write_text("repository: apps\ndeploy.yml:\n  triggers:\n    app: ['*']")
+
+    result = runner.invoke(cli.app, ["detect", "a", "b", "-m", str(infra), "-m", str(apps)])
+
+    assert result.exit_code == 1
+    assert "node names must be unique across repositories" in result.stdout
@@ -1,4 +1,7 @@
 import pytest
+from conftest import build, metadata_files, snapshot
+from hypothesis import given, settings
+from hypothesis import strategies as st
 
 from git_change_detection.models.dependency_graph import DependencyGraph
 from git_change_detection.models.node_metadata import NodeMetadata
@@ -165,3 +168,249 @@ def test_build_triggered_stages(request, graph_fixture, trigger_node, expected_s
     stages = graph.build_triggered_stages()
     assert stages == expected_stages
     assert graph.nodes[trigger_node].stage == 1
+
+
+def test_triggered_dependencies_skip_untriggered(linear_graph):
+    linear_graph.mark_triggered("a", "file1.py", "*.py")
+    linear_graph.mark_triggered("c", "file1.py", "*.py")
+    assert linear_graph.triggered_dependencies() == {"a": set(), "c": {"a"}}
+
+
+def test_triggered_dependencies_long_chain():
+    graph = DependencyGraph()
+    graph.deep_merge({f"n{i}": {"depends_on": [f"n{i - 1}"] if i else []} for i in range(3000)})
+    graph.mark_triggered("n0", "file1.py", "*.py")
+    graph.mark_triggered("n2999", "file1.py", "*.py")
+
+    assert graph.triggered_dependencies() == {"n0": set(), "n2999": {"n0"}}
+
+
+def test_build_triggered_schedule(diamond_graph):
+    for name in ("a", "b", "c", "d"):
+        diamond_graph.mark_triggered(name, "file1.py", "*.py")
+    durations = {"a": 1.0, "b": 5.0, "c": 1.0, "d": 1.0}
+
+    plan = diamond_graph.build_triggered_schedule(durations, max_parallel=2)
+
+    assert plan.makespan == 7.0
+    assert plan.staged_makespan == 7.0
+    assert plan.critical_path == ["a", "b", "d"]
+    assert {n.name for n in plan.nodes if n.critical} == {"a", "b", "d"}
+
+
+def test_build_triggered_schedule_default_duration(tree_graph):
+    tree_graph.mark_triggered("root", "file1.py", "*.py")
+    tree_graph.mark_triggered("leaf1", "file1.py", "*.py")
+    tree_graph.mark_triggered("branch2", "file1.py", "*.py")
+
+    plan = tree_graph.build_triggered_schedule({"root": 2.0}, default_duration=3.0)
+
+    # leaf1 only waits for root, yet the staged plan puts it after branch2
+    assert plan.makespan == 5.0
+    assert plan.staged_makespan == 8.0
+    assert plan.saved == 3.0
+
+
+def test_deep_merge_file_pattern_syntax():
+    graph = DependencyGraph()
+    graph.deep_merge(
+        {
+            "pattern_syntax": "glob",
+            "a": {"triggers": {"src": ["**/*.py"]}},
+            "b": {"triggers": {"src": ["*.py"]}, "pattern_syntax": "fnmatch"},
+        }
+    )
+    graph.deep_merge({"a": {"depends_on": ["b"]}})
+
+    assert "pattern_syntax" not in graph.nodes
+    assert graph.nodes["a"].pattern_syntax == "glob"
+    assert graph.nodes["b"].pattern_syntax == "fnmatch"
+
+    graph.match_triggers(["src/pkg/main.py"])
+    assert graph.nodes["a"].triggered
+    # fnmatch '*' crosses '/'
+    assert graph.nodes["b"].triggered
+
+
+def test_deep_merge_pattern_syntax_per_file():
+    """Patterns keep the syntax of the file they come from."""
+    graph = DependencyGraph()
+    graph.deep_merge({"app": {"triggers": {"src": ["*.py"]}}})
+    graph.deep_merge({"pattern_syntax": "glob", "app": {"triggers": {"docs": ["*.md"]}}})
+
+    node = graph.nodes["app"]
+    assert node.syntax_of("src", "*.py") == "fnmatch"
+    assert node.syntax_of("docs", "*.md") == "glob"
+
+    graph.match_triggers(["src/deep/x.py", "docs/deep/x.md"])
+    assert node.triggered_by == [{"file": "src/deep/x.py", "pattern": "src/*.py"}]
+
+
+def test_match_triggers_scoped_by_repository():
+    graph = DependencyGraph()
+    graph.deep_merge(
+        {
+            "repository": "apps",
+            "app": {"triggers": {"src": ["*.py"]}},
+        }
+    )
+    graph.deep_merge({"infra": {"triggers": {"src": ["*.py"]}}})
+
+    graph.match_triggers(["src/main.py"], repository="apps")
+
+    assert graph.nodes["app"].triggered_by == [{"file": "apps:src/main.py", "pattern": "src/*.py"}]
+    assert not graph.nodes["infra"].triggered
+
+
+def test_deep_merge_conflicting_repositories():
+    graph = DependencyGraph()
+    graph.deep_merge(
+        {"repository": "infra", "deploy.yml": {"triggers": {"infra": ["*"]}}}, source="infra.yml"
+    )
+
+    with pytest.raises(ValueError, match="deploy.yml.*'infra'.*'apps'"):
+        graph.deep_merge(
+            {"repository": "apps", "deploy.yml": {"triggers": {"app": ["*"]}}}, source="apps.yml"
+        )
+    assert graph.nodes["deploy.yml"].triggers == {"infra": ["*"]}
+    assert list(graph.sources) == ["infra.yml"]
+
+
+def test_deep_merge_overlay_inherits_repository():
+    graph = DependencyGraph()
+    graph.deep_merge({"repository": "apps", "app": {"triggers": {"src": ["*"]}}}, source="apps.yml")
+    graph.deep_merge({"app": {"depends_on": ["db"]}}, source="overlay.yml")
+
+    assert graph.nodes["app"].repository == "apps"
+    assert graph.nodes["app"].depends_on == ["db"]
+
+    graph.replace_source("overlay.yml", {"app": {"depends_on": ["cache"]}})
+    assert graph.nodes["app"].repository == "apps"
+    assert graph.nodes["app"].depends_on == ["cache"]
+
+
+def test_replace_source_conflicting_repositories():
+    graph = DependencyGraph()
+    graph.deep_merge({"repository": "infra", "deploy.yml": {}}, source="infra.yml")
+    graph.deep_merge({"repository": "apps", "app.yml": {}}, source="apps.yml")
+
+    with pytest.raises(ValueError, match="node names must be unique"):
+        graph.replace_source("apps.yml", {"repository": "apps", "deploy.yml": {}})
+    assert set(graph.nodes) == {"deploy.yml", "app.yml"}
+
+    # the same name in another repository is fine once blacklisted
+    graph.replace_source(
+        "apps.yml", {"repository": "apps", "deploy.yml": {}, "blacklist": ["deploy.yml"]}
+    )
+    assert set(graph.nodes) == set()
+
+
+def test_dependency_levels_long_chain():
+    graph = DependencyGraph()
+    graph.deep_merge({f"n{i}": {"depends_on": [f"n{i - 1}"] if i else []} for i in range(5000)})
+
+    levels = graph.dependency_levels()
+
+    assert levels["n4999"] == 4999
+    graph.deep_merge({"n0": {"depends_on": ["n4999"]}})
+    with pytest.raises(RuntimeError, match="possible cycle"):
+        graph.dependency_levels()
+
+
+def test_match_fingerprints():
+    graph = DependencyGraph()
+    graph.deep_merge({"new": {}, "changed": {}, "same": {}})
+
+    graph.match_fingerprints(
+        {"new": "1", "changed": "2", "same": "3"}, {"changed": "0", "same": "3"}
+    )
+
+    assert [(n.deploy_reason, n.fingerprint) for n in graph.nodes.values()] == [
+        ("never deployed", "1"),
+        ("inputs changed", "2"),
+        (None, None),
+    ]
+    assert not any(n.triggered_by or n.match_counts for n in graph.nodes.values())
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(metadata_files, min_size=1, max_size=4), st.data())
+def test_replace_source_matches_full_rebuild(files, data):
+    i = data.draw(st.integers(0, len(files) - 1))
+    new = data.draw(metadata_files)
+    g = build(files)
+
+    affected = g.replace_source(f"file{i}", new)
+
+    expected = build(files[:i] + [new] + files[i + 1 :])
+    assert snapshot(g) == snapshot(expected)
+    before = {name: node.model_dump() for name, node in build(files).nodes.items()}
+    after = {name: node.model_dump() for name, node in expected.nodes.items()}
+    assert {
+        name for name in before.keys() | after.keys() if before.get(name) != after.get(name)
+    } <= affected
+
+
+def test_replace_source_only_affects_changed_nodes():
+    g = DependencyGraph()
+    g.deep_merge({"a": {}, "b": {"depends_on": ["a"]}, "c": {}}, source="first")
+    g.deep_merge({"d": {"depends_on": ["c"]}}, source="second")
+
+    assert g.replace_source("first", {"a": {}, "b": {"depends_on": ["c"]}, "c": {}}) == {"b"}
+    assert g.replace_source("second", {"d": {"depends_on": ["c"]}, "blacklist": ["a"]}) == {"a"}
+    assert list(g.nodes) == ["b", "c", "d"]
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.lists(metadata_files, min_size=1, max_size=4), st.data())
+def test_retract_source_matches_full_rebuild(files, data):
+    i = data.draw(st.integers(0, len(files) - 1))
+    g = build(files)
+
+    g.retract_source(f"file{i}")
+
+    assert snapshot(g) == snapshot(build(files[:i] + files[i + 1 :]))
+    assert f"file{i}" not in g.sources
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(metadata_files, min_size=1, max_size=4), st.data())
+def test_update_dependency_levels_matches_full_rebuild(files, data):
+    i = data.draw(st.integers(0, len(files) - 1))
+    new = data.draw(metadata_files)
+    g = build(files)
+    expected = build(files[:i] + [new] + files[i + 1 :])
+    try:
+        levels = g.dependency_levels()
+        expected_levels = expected.dependency_levels()
+    except RuntimeError:
+        return
+
+    g.update_dependency_levels(levels, g.replace_source(f"file{i}", new))
+
+    assert levels == expected_levels
+
+
+def test_reload_file(tmp_path):
+    first = tmp_path / "a.yaml"
+    second = tmp_path / "b.yaml"
+    first.write_text("a:\n  triggers:\n    src: ['*.py']\n")
+    second.write_text("b:\n  depends_on: [a]\n")
+    g = DependencyGraph()
+    g.load_files([first, second])
+
+    first.write_text("blacklist: [a]\nc:\n  depends_on: [b]\n")
+    affected = g.reload_file(first)
+
+    assert affected == {"a", "b", "c"}
+    assert set(g.nodes) == {"b", "c"}
+    assert g.nodes["b"].depends_on == []
+
+
+def test_stages_from_levels_matches_build_triggered_stages(diamond_graph):
+    levels = diamond_graph.dependency_levels()
+    for name in ("a", "c", "d"):
+        diamond_graph.nodes[name].triggered = True
+
+    assert levels == {"a": 0, "b": 1, "c": 1, "d": 2}
+    assert diamond_graph.stages_from_levels(levels) == diamond_graph.build_triggered_stages()
@@ -1,6 +1,6 @@
 import pytest
 
-from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.models.node_metadata import MAX_CAUSES, NodeMetadata
 
 
 @pytest.mark.parametrize(
@@ -59,3 +59,27 @@ def test_merge_and_trigger_combined():
     assert set(node.triggers["src"]) == {"*.py", "*.yaml"}
     assert node.triggered is True
     assert node.triggered_by == [{"file": "file2.yaml", "pattern": "src/*.yaml"}]
+
+
+def test_mark_triggered_bounded():
+    node = NodeMetadata(name="catch_all")
+    for i in range(100):
+        node.mark_triggered(f"src/file{i}.py", "src/*")
+        node.mark_triggered(f"src/file{i}.py", "src/*.py")
+
+    assert node.triggered is True
+    assert node.matched_files == 100
+    assert node.match_counts == {"src/*": 100, "src/*.py": 100}
+    assert node.triggered_by == [
+        {"file": f"src/file{i}.py", "pattern": "src/*"} for i in range(MAX_CAUSES)
+    ]
+
+
+def test_mark_triggered_full_detail():
+    node = NodeMetadata(name="catch_all")
+    for i in range(100):
+        node.mark_triggered(f"src/file{i}.py", "src/*", max_causes=None)
+        node.mark_triggered(f"src/file{i}.py", "src/*.py", max_causes=None)
+
+    assert node.matched_files == 100
+    assert len(node.triggered_by) == 200
@@ -0,0 +1,124 @@
+import struct
+
+import pytest
+
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.utils.compiled import (
+    FORMAT_VERSION,
+    HEADER,
+    CompiledMetadata,
+    compile_graph,
+)
+
+
+@pytest.fixture
+def graph():
+    g = DependencyGraph()
+    g.deep_merge(
+        {
+            "blacklist": ["legacy"],
+            "app": {"depends_on": ["base", "legacy", "missing"], "triggers": {"src": ["*.py"]}},
+            "base": {"triggers": {"": ["Dockerfile", "lib/[a-c]*"]}},
+            "docs": {
+                "pattern_syntax": "glob",
+                "triggers": {"docs": ["**/*.md", "!drafts/**"], "": ["*.rst"]},
+            },
+            "legacy": {"triggers": {"old": ["*"]}},
+            "infra": {"repository": "infra", "triggers": {"terraform": ["*.tf"]}},
+            "héllo": {"triggers": {"ünïcode": ["*"]}},
+        }
+    )
+    g.deep_merge({"pattern_syntax": "glob", "app": {"triggers": {"src": ["pkg/*.py"]}}})
+    return g
+
+
+def test_compile_round_trip(graph, tmp_path):
+    path = tmp_path / "metadata.gcdc"
+    compile_graph(graph, path)
+
+    artifact = CompiledMetadata(path)
+    loaded = artifact.graph()
+
+    graph.sanitize_dependencies()
+    assert {n: node.model_dump() for n, node in loaded.nodes.items()} == {
+        n: node.model_dump() for n, node in graph.nodes.items()
+    }
+    assert loaded.blacklist == {"legacy"}
+    assert list(loaded.nodes) == list(graph.nodes)
+
+
+def test_compile_replaces_artifact_atomically(graph, tmp_path):
+    path = tmp_path / "metadata.gcdc"
+    compile_graph(graph, path)
+    artifact = CompiledMetadata(path)
+
+    graph.deep_merge({"extra": {}})
+    compile_graph(graph, path)
+
+    # the mapped previous artifact is left intact, the new one is complete
+    assert "extra" not in artifact.graph().nodes
+    assert "extra" in CompiledMetadata(path).graph().nodes
+    assert [p.name for p in tmp_path.iterdir()] == ["metadata.gcdc"]
+
+
+def test_compile_failure_keeps_previous_artifact(graph, tmp_path, mocker):
+    path = tmp_path / "metadata.gcdc"
+    compile_graph(graph, path)
+    mocker.patch("git_change_detection.utils.compiled.os.replace", side_effect=OSError("full"))
+
+    with pytest.raises(OSError, match="full"):
+        compile_graph(DependencyGraph(), path)
+
+    assert set(CompiledMetadata(path).graph().nodes) == set(graph.nodes)
+    assert [p.name for p in tmp_path.iterdir()] == ["metadata.gcdc"]
+
+
+def test_compiled_trigger_index(graph, tmp_path):
+    path = tmp_path / "metadata.gcdc"
+    compile_graph(graph, path)
+    files = [
+        "src/main.py",
+        "src/pkg/deep/main.py",
+        "Dockerfile",
+        "lib/b.txt",
+        "lib/d.txt",
+        "docs/guide/index.md",
+        "docs/drafts/wip.md",
+        "README.rst",
+        "terraform/main.tf",
+        "ünïcode/x",
+    ]
+
+    index = CompiledMetadata(path).trigger_index()
+    expected = graph.build_trigger_index()
+
+    assert list(index.match(files)) == list(expected.match(files))
+    for directory in ("docs", "docs/drafts", "terraform", "lib"):
+        assert index.may_match_within(directory) == expected.may_match_within(directory)
+
+
+def test_compiled_version_mismatch(graph, tmp_path):
+    path = tmp_path / "metadata.gcdc"
+    compile_graph(graph, path)
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 4, FORMAT_VERSION + 1)
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="compile it again"):
+        CompiledMetadata(path)
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        (b"", "empty file"),
+        (b"GC", "truncated header"),
+        (b"YAML" + b"\0" * HEADER.size, "not a compiled artifact"),
+    ],
+)
+def test_compiled_invalid_file(tmp_path, content, message):
+    path = tmp_path / "metadata.gcdc"
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError, match=message):
+        CompiledMetadata(path)
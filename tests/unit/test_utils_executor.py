@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from git_change_detection.models.dependency_graph import DependencyGraph
+from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.utils.executor import execute_triggered, run_graph
+
+
+def run(preds, command, **kwargs):
+    return asyncio.run(run_graph(preds, command, **kwargs))
+
+
+def test_run_graph_streams_logs_in_dependency_order():
+    lines = []
+    results = run(
+        {"a": set(), "b": {"a"}},
+        "echo {node}; echo $GCD_NODE",
+        log=lambda node, line: lines.append((node, line)),
+    )
+    assert all(r.status == "success" for r in results.values())
+    assert lines == [("a", "a"), ("a", "a"), ("b", "b"), ("b", "b")]
+    assert results["b"].start >= results["a"].finish
+
+
+def test_run_graph_continue_on_error_skips_descendants():
+    preds = {"bad": set(), "child": {"bad"}, "other": set()}
+    results = run(preds, "test {node} != bad")
+    assert results["bad"].status == "failed"
+    assert results["bad"].returncode == 1
+    assert results["child"].status == "skipped"
+    assert results["other"].status == "success"
+
+
+def test_run_graph_fail_fast_cancels_running_nodes():
+    preds = {"bad": set(), "slow": set(), "after": {"slow"}}
+    results = run(preds, "if [ {node} = bad ]; then exit 3; fi; sleep 5", fail_fast=True)
+    assert results["bad"].status == "failed"
+    assert results["slow"].status == "cancelled"
+    assert results["after"].status == "skipped"
+
+
+def test_run_graph_long_output_lines():
+    lines = []
+    results = run(
+        {"a": set()},
+        "python3 -c \"print('x' * 200000); print('end', end='')\"",
+        log=lambda node, line: lines.append(line),
+    )
+    assert results["a"].status == "success"
+    assert lines == ["x" * 200000, "end"]
+
+
+def test_run_graph_node_error_is_a_failure(tmp_path):
+    preds = {"a": set(), "child": {"a"}}
+    lines = []
+    results = run(
+        preds,
+        "true",
+        cwd=str(tmp_path / "missing"),
+        log=lambda node, line: lines.append((node, line)),
+    )
+    assert results["a"].status == "failed"
+    assert results["a"].returncode is None
+    assert results["child"].status == "skipped"
+    assert lines and lines[0][1].startswith("error:")
+
+
+@pytest.mark.parametrize("max_parallel", [1, 2])
+def test_run_graph_max_parallel(max_parallel):
+    preds = {name: set() for name in "abc"}
+    results = run(preds, "sleep 0.1", max_parallel=max_parallel)
+    runs = sorted(results.values(), key=lambda r: r.start)
+    for i, current in enumerate(runs):
+        overlapping = [r for r in runs[:i] if r.finish > current.start]
+        assert len(overlapping) < max_parallel
+
+
+def test_execute_triggered_report():
+    graph = DependencyGraph()
+    graph.nodes = {
+        "a": NodeMetadata(name="a"),
+        "b": NodeMetadata(name="b", depends_on=["a"]),
+        "c": NodeMetadata(name="c"),
+    }
+    for name in ("a", "b"):
+        graph.mark_triggered(name, "file1.py", "*.py")
+
+    report = execute_triggered(graph, "true")
+
+    assert report.succeeded
+    assert [r.name for r in report.runs] == ["a", "b"]
+    assert report.staged_time >= 0.0
@@ -0,0 +1,76 @@
+import pytest
+from conftest import commit_files
+from git import Repo
+
+from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.utils.fingerprint import Fingerprinter
+from git_change_detection.utils.patterns import TriggerIndex
+
+
+@pytest.fixture
+def repo_path(git_repo):
+    commit_files(
+        git_repo,
+        {
+            "app/main.py": "main",
+            "app/lib/util.py": "util",
+            "docs/index.md": "docs",
+            "vendor/big/file.txt": "vendor",
+        },
+    )
+    return git_repo
+
+
+@pytest.fixture
+def fingerprinter():
+    index = TriggerIndex.from_nodes(
+        [
+            NodeMetadata(name="app", triggers={"app": ["*.py"]}),
+            NodeMetadata(name="docs", triggers={"docs": ["**/*.md"]}, pattern_syntax="glob"),
+            NodeMetadata(name="none", triggers={"missing": ["*"]}),
+        ]
+    )
+    return Fingerprinter(index)
+
+
+def test_fingerprints_follow_matching_files(repo_path, fingerprinter):
+    first = fingerprinter.fingerprints(Repo(repo_path).head.commit.tree)
+    assert set(first) == {"app", "docs"}
+
+    second = fingerprinter.fingerprints(
+        commit_files(repo_path, {"docs/index.md": "changed", "README": "readme"}).tree
+    )
+    assert second["app"] == first["app"]
+    assert second["docs"] != first["docs"]
+
+    # reverting the content restores the fingerprint
+    third = fingerprinter.fingerprints(commit_files(repo_path, {"docs/index.md": "docs"}).tree)
+    assert third == first
+
+
+def test_fingerprints_detect_added_and_removed_files(repo_path, fingerprinter):
+    first = fingerprinter.fingerprints(Repo(repo_path).head.commit.tree)
+
+    added = fingerprinter.fingerprints(commit_files(repo_path, {"app/new.py": "new"}).tree)
+    removed = fingerprinter.fingerprints(commit_files(repo_path, {"app/new.py": None}).tree)
+
+    assert added["app"] != first["app"]
+    assert removed == first
+
+
+def test_fingerprints_memoise_and_prune_trees(repo_path, fingerprinter):
+    fingerprinter.fingerprints(Repo(repo_path).head.commit.tree)
+    # root, app, app/lib and docs: vendor cannot match any trigger
+    assert fingerprinter.trees_walked == 4
+
+    fingerprinter.fingerprints(commit_files(repo_path, {"docs/index.md": "changed"}).tree)
+    # only the root and docs changed
+    assert fingerprinter.trees_walked == 6
+
+
+def test_fingerprints_independent_of_cache(repo_path, fingerprinter):
+    fingerprinter.fingerprints(Repo(repo_path).head.commit.tree)
+    tree = commit_files(repo_path, {"app/lib/util.py": "changed"}).tree
+
+    fresh = Fingerprinter(fingerprinter.index)
+    assert fingerprinter.fingerprints(tree) == fresh.fingerprints(tree)
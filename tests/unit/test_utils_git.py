@@ -1,4 +1,9 @@
+import subprocess
+import threading
+from pathlib import Path
+
 import pytest
+from conftest import git
 from git import BadName, InvalidGitRepositoryError
 
 import git_change_detection.utils.git as git_utils
@@ -68,3 +73,169 @@ def test_get_changed_files_diff_variants(diff_entries, expected_files, mock_repo
 
     files = git_utils.get_changed_files("a", "b")
     assert sorted(files) == sorted(expected_files)
+
+
+@pytest.fixture
+def repo_with_submodule(tmp_path):
+    """Parent repo pinning libs/sub, whose pointer moves in the last commit."""
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    git(sub, "init", "-q")
+    (sub / "a.txt").write_text("a")
+    git(sub, "add", ".")
+    git(sub, "commit", "-qm", "initial")
+
+    parent = tmp_path / "parent"
+    parent.mkdir()
+    git(parent, "init", "-q")
+    (parent / "root.txt").write_text("root")
+    git(parent, "add", ".")
+    git(parent, "commit", "-qm", "initial")
+    git(parent, "-c", "protocol.file.allow=always", "submodule", "add", "-q", str(sub), "libs/sub")
+    git(parent, "commit", "-qm", "add submodule")
+
+    checkout = parent / "libs" / "sub"
+    (checkout / "a.txt").write_text("changed")
+    (checkout / "dir").mkdir()
+    (checkout / "dir" / "b.txt").write_text("b")
+    git(checkout, "add", ".")
+    git(checkout, "commit", "-qm", "update")
+    git(parent, "add", "libs/sub")
+    git(parent, "commit", "-qm", "bump submodule")
+    return parent
+
+
+@pytest.mark.parametrize(
+    "submodules, expected",
+    [
+        (False, ["libs/sub"]),
+        (True, ["libs/sub", "libs/sub/a.txt", "libs/sub/dir/b.txt"]),
+    ],
+)
+def test_get_changed_files_submodule_update(repo_with_submodule, submodules, expected):
+    files = git_utils.get_changed_files("HEAD~1", "HEAD", repo_with_submodule, submodules)
+    assert files == expected
+
+
+def test_get_changed_files_submodule_added(repo_with_submodule):
+    files = git_utils.get_changed_files("HEAD~2", "HEAD~1", repo_with_submodule, True)
+    assert files == [".gitmodules", "libs/sub", "libs/sub/a.txt"]
+
+
+def test_get_changed_files_submodule_missing_commit(repo_with_submodule):
+    git(repo_with_submodule / "libs" / "sub", "reset", "-q", "--hard", "HEAD~1")
+    git(repo_with_submodule / "libs" / "sub", "reflog", "expire", "--expire=now", "--all")
+    git(repo_with_submodule / "libs" / "sub", "gc", "-q", "--prune=now")
+
+    with pytest.raises(RuntimeError, match="not found locally"):
+        git_utils.get_changed_files("HEAD~1", "HEAD", repo_with_submodule, True)
+
+
+def test_get_changed_files_submodule_reads_parent_in_calling_thread(
+    repo_with_submodule, monkeypatch
+):
+    readers = []
+    submodules = git_utils.Repo.submodules
+
+    def record(self):
+        readers.append((Path(self.working_dir), threading.current_thread()))
+        return submodules.fget(self)
+
+    monkeypatch.setattr(git_utils.Repo, "submodules", property(record))
+    files = git_utils.get_changed_files("HEAD~1", "HEAD", repo_with_submodule, True)
+
+    assert files == ["libs/sub", "libs/sub/a.txt", "libs/sub/dir/b.txt"]
+    pooled = [path for path, thread in readers if thread.name.startswith("ThreadPoolExecutor")]
+    assert repo_with_submodule not in pooled
+
+
+def test_submodule_names_read_at_commits(repo_with_submodule):
+    git(repo_with_submodule, "mv", "libs/sub", "libs/moved")
+    git(repo_with_submodule, "commit", "-qm", "move submodule")
+    repo = git_utils.Repo(repo_with_submodule)
+    head, previous = repo.commit("HEAD"), repo.commit("HEAD~1")
+
+    names = git_utils._submodule_names(repo, head, previous)
+    assert names == {"libs/moved": "libs/sub", "libs/sub": "libs/sub"}
+    assert git_utils._submodule_names(repo, repo.commit("HEAD~3")) == {}
+
+
+def test_get_changed_files_many(repo_with_submodule):
+    changes = git_utils.get_changed_files_many(
+        {
+            None: ("HEAD~1", "HEAD", repo_with_submodule),
+            "sub": ("HEAD~1", "HEAD", repo_with_submodule / "libs" / "sub"),
+        }
+    )
+    assert changes == {None: ["libs/sub"], "sub": ["a.txt", "dir/b.txt"]}
+
+
+def test_get_changed_files_many_names_failing_repository(tmp_path):
+    with pytest.raises(RuntimeError, match="^apps: .* not a valid Git repository"):
+        git_utils.get_changed_files_many({"apps": ("a", "b", tmp_path / "missing")})
+
+
+@pytest.fixture
+def shallow_clone(tmp_path):
+    """Depth-1 clone of 'feature', which forked from 'main' 5 commits before its tip."""
+    src = tmp_path / "src"
+    src.mkdir()
+    git(src, "init", "-q", "-b", "main")
+    for i in range(20):
+        (src / "main.txt").write_text(str(i))
+        git(src, "add", ".")
+        git(src, "commit", "-qm", f"main {i}")
+    git(src, "checkout", "-qb", "feature", "HEAD~5")
+    for i in range(10):
+        (src / f"feature{i}.txt").write_text(str(i))
+        git(src, "add", ".")
+        git(src, "commit", "-qm", f"feature {i}")
+    base = (
+        subprocess.run(
+            ["git", "merge-base", "main", "feature"], cwd=src, check=True, capture_output=True
+        )
+        .stdout.decode()
+        .strip()
+    )
+
+    git(tmp_path, "clone", "-q", "--bare", str(src), "bare.git")
+    git(
+        tmp_path,
+        "clone",
+        "-q",
+        "--depth",
+        "1",
+        "-b",
+        "feature",
+        f"file://{tmp_path}/bare.git",
+        "ci",
+    )
+    return tmp_path / "ci", base
+
+
+def test_resolve_merge_base_deepens_shallow_clone(shallow_clone):
+    clone, expected = shallow_clone
+
+    base = git_utils.resolve_merge_base("main", "HEAD", clone, deepen=2)
+
+    assert base == expected
+    # 2 + 4 + 8 commits were enough, the clone was not fully unshallowed
+    assert (clone / ".git" / "shallow").exists()
+
+
+def test_resolve_merge_base_full_clone_without_common_ancestor(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "main")
+    git(repo, "checkout", "-q", "--orphan", "other")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "other")
+
+    with pytest.raises(RuntimeError, match="no common ancestor"):
+        git_utils.resolve_merge_base("main", "other", repo)
+
+
+def test_resolve_merge_base_unknown_reference(shallow_clone):
+    clone, _ = shallow_clone
+    with pytest.raises(RuntimeError, match="'missing' not found locally nor on 'origin'"):
+        git_utils.resolve_merge_base("missing", "HEAD", clone)
@@ -1,11 +1,17 @@
 import json
+import sqlite3
 import tempfile
 from pathlib import Path
 
 import pytest
 import yaml
 
-from git_change_detection.utils.io import load_metadata_file
+from git_change_detection.utils.io import (
+    load_deployed,
+    load_durations,
+    load_metadata_file,
+    record_deployed,
+)
 
 
 @pytest.mark.parametrize(
@@ -36,3 +42,51 @@ def test_unsupported_extension():
         f.flush()
         with pytest.raises(ValueError):
             load_metadata_file(Path(f.name))
+
+
+def test_load_durations_json(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"a": 10, "b": [4, 6]}))
+    assert load_durations(path) == {"a": 10.0, "b": 5.0}
+
+
+def test_load_durations_sqlite(tmp_path):
+    path = tmp_path / "durations.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE durations (node TEXT, seconds REAL)")
+    conn.executemany("INSERT INTO durations VALUES (?, ?)", [("a", 2), ("a", 4), ("b", 1)])
+    conn.commit()
+    conn.close()
+    assert load_durations(path) == {"a": 3.0, "b": 1.0}
+
+
+def test_load_durations_unsupported_extension(tmp_path):
+    path = tmp_path / "durations.txt"
+    path.write_text("a: 1")
+    with pytest.raises(ValueError):
+        load_durations(path)
+
+
+@pytest.mark.parametrize("content", ["[1, 2]", '"a"', "3", '{"a": [null]}'])
+def test_load_durations_invalid_json(tmp_path, content):
+    path = tmp_path / "durations.json"
+    path.write_text(content)
+    with pytest.raises(ValueError, match="Invalid durations"):
+        load_durations(path)
+
+
+def test_record_and_load_deployed(tmp_path):
+    path = tmp_path / "state.db"
+    assert load_deployed(path) == {}
+
+    record_deployed(path, {"a": "1111", "b": "2222"}, "abc")
+    record_deployed(path, {"a": "3333"}, "def")
+
+    assert load_deployed(path) == {"a": "3333", "b": "2222"}
+
+
+def test_load_deployed_invalid(tmp_path):
+    path = tmp_path / "state.db"
+    sqlite3.connect(path).close()
+    with pytest.raises(ValueError, match="Invalid deploy state"):
+        load_deployed(path)
@@ -1,10 +1,14 @@
 import json
 
 import pytest
+import yaml
 
 from git_change_detection.models.dependency_graph import DependencyGraph
 from git_change_detection.models.node_metadata import NodeMetadata
-from git_change_detection.utils.output import render_output  # adjust import if needed
+from git_change_detection.utils.output import (  # adjust import if needed
+    render_output,
+    render_pipeline,
+)
 
 
 def make_graph(triggered=False):
@@ -69,3 +73,129 @@ def test_render_output_with_cycles(capsys):
     out = capsys.readouterr().out
     assert "Dependency cycles detected" in out
     assert "node1 → node2 → node1" in out
+
+
+def make_large_graph(nodes=3, files=10):
+    g = DependencyGraph()
+    for i in range(nodes):
+        node = NodeMetadata(name=f"node{i}")
+        for j in range(files):
+            node.mark_triggered(f"src/file{j}.py", "src/*.py")
+        g.nodes[node.name] = node
+    return g
+
+
+@pytest.mark.parametrize("fmt", ["table", "plain"])
+def test_render_output_limits(fmt, capsys):
+    graph = make_large_graph()
+    changed_files = [f"src/file{j}.py" for j in range(10)]
+
+    render_output(graph, changed_files, [], [list(graph.nodes)], fmt=fmt, max_rows=2, max_files=3)
+    out = capsys.readouterr().out
+
+    assert "src/file2.py" in out
+    assert "src/file3.py" not in out
+    assert "... and 7 more" in out
+    assert "... and 1 more triggered nodes" in out
+    assert "Stage 1: node0, node1, node2" in out
+
+
+@pytest.mark.parametrize("fmt", ["table", "plain"])
+def test_render_output_summary(fmt, capsys):
+    graph = make_large_graph(nodes=1, files=8)
+
+    render_output(graph, ["src/file0.py"], [], [["node0"]], fmt=fmt, summary=True)
+    out = capsys.readouterr().out
+
+    assert "8 files" in out
+    assert "src/*.py (8)" in out
+    assert "src/file4.py" in out
+    assert "src/file5.py" not in out
+
+
+def test_render_output_plain(capsys):
+    graph = make_graph(triggered=True)
+
+    render_output(graph, ["file1.py"], [["node1", "node2", "node1"]], [["node1"]], fmt="plain")
+    out = capsys.readouterr().out
+
+    assert "Changed files (1)" in out
+    assert "  node1 (1 files)" in out
+    assert "    pattern: src/*.py" in out
+    assert "    file: file1.py" in out
+    assert "node1 → node2 → node1" in out
+    assert "\x1b[" not in out
+
+
+@pytest.mark.parametrize("fmt", ["plain", "table"])
+def test_render_output_deploy_reason(fmt, capsys):
+    graph = make_graph()
+    graph.nodes["node2"].mark_undeployed("inputs changed", "0123456789abcdef")
+
+    render_output(graph, [], [], [["node2"]], fmt=fmt, summary=True)
+    out = capsys.readouterr().out
+
+    assert "inputs changed, fingerprint 0123456789ab" in out
+    assert "files" not in out.split("Triggered Nodes")[1]
+
+
+def test_render_output_single_write(mocker):
+    graph = make_large_graph()
+    write = mocker.patch("sys.stdout.write")
+
+    render_output(graph, [f"f{i}" for i in range(100)], [], [list(graph.nodes)], fmt="table")
+
+    assert len([c for c in write.call_args_list if c.args[0]]) == 1
+
+
+def test_render_output_bounded_causes(capsys):
+    graph = make_large_graph(nodes=1, files=1000)
+
+    render_output(graph, [], [], [], fmt="plain")
+    out = capsys.readouterr().out
+
+    assert "node0 (1000 files)" in out
+    assert "... and 980 more" in out
+
+    render_output(graph, [], [], [], fmt="json")
+    node = json.loads(capsys.readouterr().out)["node0"]
+    assert len(node["triggered_by"]) == 20
+    assert node["match_counts"] == {"src/*.py": 1000}
+
+
+def test_render_pipeline(capsys):
+    """Jobs only need their nearest triggered dependencies, through untriggered ones."""
+    g = DependencyGraph()
+    g.deep_merge(
+        {
+            "base": {},
+            "skipped": {"depends_on": ["base"]},
+            "app": {"depends_on": ["skipped"]},
+            "web": {"depends_on": ["base", "app"]},
+            ".hidden": {},
+        }
+    )
+    for name in ("base", "app", "web", ".hidden"):
+        g.nodes[name].mark_triggered("file", "*")
+
+    render_pipeline(g, ".deploy", ["ci/deploy.yml"])
+    pipeline = yaml.safe_load(capsys.readouterr().out)
+
+    assert pipeline == {
+        "include": [{"local": "ci/deploy.yml"}],
+        "base": {"extends": ".deploy", "variables": {"GCD_NODE": "base"}, "needs": []},
+        "app": {"extends": ".deploy", "variables": {"GCD_NODE": "app"}, "needs": ["base"]},
+        "web": {"extends": ".deploy", "variables": {"GCD_NODE": "web"}, "needs": ["app"]},
+        "deploy .hidden": {
+            "extends": ".deploy",
+            "variables": {"GCD_NODE": ".hidden"},
+            "needs": [],
+        },
+    }
+
+
+def test_render_pipeline_nothing_triggered(capsys):
+    render_pipeline(make_graph())
+    pipeline = yaml.safe_load(capsys.readouterr().out)
+
+    assert list(pipeline) == ["no-triggered-nodes"]
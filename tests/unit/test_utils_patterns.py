@@ -0,0 +1,167 @@
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from git_change_detection.models.node_metadata import NodeMetadata
+from git_change_detection.utils.patterns import GlobAutomaton, TriggerIndex, split_glob
+
+
+def glob_matches(pattern, path):
+    automaton = GlobAutomaton()
+    automaton.add(pattern, "node", pattern)
+    return any(p == path for p, _ in automaton.match_paths([path]))
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    [
+        ("src/*.py", "src/main.py", True),
+        ("src/*.py", "src/pkg/main.py", False),
+        ("src/**/*.py", "src/main.py", True),
+        ("src/**/*.py", "src/a/b/main.py", True),
+        ("src/**", "src/a/b/main.py", True),
+        ("src/**", "src", False),
+        ("**/tasks/*.yml", "roles/web/tasks/main.yml", True),
+        ("**/tasks/*.yml", "tasks/main.yml", True),
+        ("vars/?.yml", "vars/a.yml", True),
+        ("vars/?.yml", "vars/ab.yml", False),
+        ("vars/[a-c]*.yml", "vars/b1.yml", True),
+        ("vars/[!a-c]*.yml", "vars/b1.yml", False),
+        ("vars/\\*.yml", "vars/*.yml", True),
+        ("vars/\\*.yml", "vars/a.yml", False),
+    ],
+)
+def test_glob_semantics(pattern, path, expected):
+    assert glob_matches(pattern, path) is expected
+
+
+def test_split_glob_collapses_globstars():
+    assert split_glob("a/**/**/b") == ["a", "**", "b"]
+    assert split_glob("a/**") == ["a", "*", "**"]
+
+
+def test_automaton_prunes_dead_subtrees():
+    automaton = GlobAutomaton()
+    automaton.add("src/**/*.py", "node", "src/**/*.py")
+    paths = [f"docs/{i}/page.md" for i in range(100)] + ["src/a/main.py"]
+
+    matched = [path for path, _ in automaton.match_paths(paths)]
+
+    assert matched == ["src/a/main.py"]
+    # "docs" is evaluated once and prunes every path below it
+    assert automaton.steps <= 4
+
+
+def test_trigger_index_fnmatch_matches_legacy_behaviour():
+    node = NodeMetadata(name="n", triggers={"src": ["*.py", "lib/[ab].txt"]})
+    paths = ["src/main.py", "src/pkg/main.py", "src/lib/a.txt", "other/main.py"]
+
+    index = TriggerIndex.from_nodes([node])
+
+    expected = [
+        (p, "n", f"src/{pat}")
+        for p in paths
+        for pat in node.triggers["src"]
+        if fnmatch.fnmatch(p, f"src/{pat}")
+    ]
+    assert list(index.match(paths)) == expected
+
+
+def test_trigger_index_glob_negation():
+    nodes = [
+        NodeMetadata(
+            name="app",
+            pattern_syntax="glob",
+            triggers={"src": ["**/*.py", "!**/test_*.py"]},
+        ),
+        NodeMetadata(name="tests", pattern_syntax="glob", triggers={"src": ["**/test_*.py"]}),
+    ]
+
+    index = TriggerIndex.from_nodes(nodes)
+    result = list(index.match(["src/app/main.py", "src/app/test_main.py"]))
+
+    assert result == [
+        ("src/app/main.py", "app", "src/**/*.py"),
+        ("src/app/test_main.py", "tests", "src/**/test_*.py"),
+    ]
+    assert index.evaluations > 0
+
+
+@pytest.mark.parametrize(
+    "directory, expected",
+    [
+        ("src", True),
+        ("src/app/lib", True),
+        ("charts", True),
+        ("charts/web", True),
+        ("charts/db", False),
+        ("docs", False),
+        ("sr", False),
+    ],
+)
+def test_may_match_within(directory, expected):
+    index = TriggerIndex.from_nodes(
+        [
+            NodeMetadata(name="a", triggers={"src": ["*.py"]}),
+            NodeMetadata(
+                name="b", triggers={"charts/web": ["**", "!docs/**"]}, pattern_syntax="glob"
+            ),
+        ]
+    )
+    assert index.may_match_within(directory) is expected
+
+
+def test_remove_node():
+    index = TriggerIndex.from_nodes(
+        [
+            NodeMetadata(name="a", triggers={"src": ["*.py"]}),
+            NodeMetadata(name="b", triggers={"src": ["**/*.py"]}, pattern_syntax="glob"),
+        ]
+    )
+
+    index.remove_node("a")
+    index.remove_node("b")
+
+    assert len(index) == 0
+    assert list(index.match(["src/main.py"])) == []
+    assert not index.may_match_within("src")
+
+
+def test_remove_node_after_matching_keeps_other_nodes():
+    nodes = [
+        NodeMetadata(name="a", triggers={"src": ["*.py", "*.md"]}),
+        NodeMetadata(name="b", triggers={"src": ["*.py"]}),
+        NodeMetadata(name="c", triggers={"src": ["**/*.py"]}, pattern_syntax="glob"),
+    ]
+    index = TriggerIndex.from_nodes(nodes)
+    paths = ["src/main.py", "src/README.md"]
+    list(index.match(paths))  # builds the prefix groups
+
+    index.remove_node("a")
+    index.add_node(NodeMetadata(name="a", triggers={"src": ["*.md"]}))
+
+    expected = TriggerIndex.from_nodes(
+        [*nodes[1:], NodeMetadata(name="a", triggers={"src": ["*.md"]})]
+    )
+    assert list(index.match(paths)) == list(expected.match(paths))
+    assert index.order == expected.order
+    assert index.fnmatch_patterns == expected.fnmatch_patterns
+
+
+def test_trigger_index_concurrent_matches():
+    """Lazily compiled state is shared safely by threads matching at once."""
+    nodes = [
+        NodeMetadata(name=f"n{i}", triggers={f"dir{i}": ["*.py", "**/*.md"]}, pattern_syntax=syntax)
+        for i in range(50)
+        for syntax in ("fnmatch", "glob")
+        if (i % 2 == 0) == (syntax == "glob")
+    ]
+    paths = [f"dir{i}/{sub}/file.{ext}" for i in range(50) for sub in "abc" for ext in ("py", "md")]
+    expected = list(TriggerIndex.from_nodes(nodes).match(paths))
+
+    index = TriggerIndex.from_nodes(nodes)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: list(index.match(paths)), range(32)))
+
+    assert all(result == expected for result in results)
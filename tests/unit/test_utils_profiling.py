@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from git_change_detection.utils.profiling import NULL_PROFILER, Profiler, profiling
+
+
+def test_profiler_records_phases_and_counters():
+    profiler = Profiler()
+    with profiler.phase("parse"):
+        sum(range(1000))
+    profiler.count("nodes", 3)
+    profiler.count("nodes")
+
+    report = profiler.report()
+
+    assert [p["name"] for p in report["phases"]] == ["parse"]
+    assert report["phases"][0]["wall"] >= 0.0
+    assert report["counters"] == {"nodes": 4}
+
+
+def test_profiler_total_cpu_since_start(mocker):
+    """CPU time spent before the profiler started, e.g. on imports, is not reported."""
+    mocker.patch("time.process_time", side_effect=[5.0, 5.25])
+
+    report = Profiler().report()
+
+    assert report["total_cpu"] == 0.25
+
+
+def test_profiler_trace_events():
+    profiler = Profiler()
+    with profiler.phase("git_diff"):
+        pass
+    profiler.count("changed_files", 2)
+
+    events = profiler.trace_events()["traceEvents"]
+
+    assert events[0]["name"] == "git_diff"
+    assert events[0]["ph"] == "X"
+    assert events[-1]["ph"] == "C"
+    assert events[-1]["args"]["changed_files"] == 2
+
+
+@pytest.mark.parametrize("fmt, key", [("json", "phases"), ("trace", "traceEvents")])
+def test_profiling_writes_on_exit(tmp_path, fmt, key):
+    path = tmp_path / "profile.json"
+    with pytest.raises(RuntimeError), profiling(path, fmt) as profiler, profiler.phase("render"):
+        raise RuntimeError("boom")
+
+    assert key in json.loads(path.read_text())
+
+
+def test_profiling_disabled():
+    with profiling(None) as profiler, profiler.phase("render"):
+        profiler.count("nodes")
+    assert profiler is NULL_PROFILER
+    assert not profiler.enabled
@@ -0,0 +1,77 @@
+import pytest
+
+from git_change_detection.utils.scheduling import (
+    critical_path,
+    list_schedule,
+    staged_makespan,
+    topological_order,
+    transitive_reduction,
+)
+
+
+@pytest.fixture
+def fork_dag():
+    """a -> c, b (slow) -> d: c does not need to wait for b."""
+    preds = {"a": set(), "b": set(), "c": {"a"}, "d": {"b"}}
+    durations = {"a": 1.0, "b": 10.0, "c": 1.0, "d": 1.0}
+    return preds, durations
+
+
+def test_topological_order_respects_dependencies(fork_dag):
+    preds, _ = fork_dag
+    order = topological_order(preds)
+    for node, deps in preds.items():
+        for dep in deps:
+            assert order.index(dep) < order.index(node)
+
+
+def test_topological_order_cycle():
+    with pytest.raises(RuntimeError, match="possible cycle"):
+        topological_order({"a": {"b"}, "b": {"a"}})
+
+
+def test_list_schedule_starts_nodes_without_barriers(fork_dag):
+    preds, durations = fork_dag
+    result = list_schedule(preds, durations)
+    assert result["c"][0] == 1.0
+    assert result["d"][1] == 11.0
+
+
+@pytest.mark.parametrize("max_parallel, expected_makespan", [(None, 11.0), (1, 13.0), (2, 11.0)])
+def test_list_schedule_max_parallel(fork_dag, max_parallel, expected_makespan):
+    preds, durations = fork_dag
+    result = list_schedule(preds, durations, max_parallel)
+    assert max(finish for _, finish, _ in result.values()) == expected_makespan
+    if max_parallel:
+        assert {slot for _, _, slot in result.values()} <= set(range(max_parallel))
+
+
+def test_critical_path(fork_dag):
+    preds, durations = fork_dag
+    assert critical_path(preds, durations) == ["b", "d"]
+
+
+def test_staged_makespan(fork_dag):
+    _, durations = fork_dag
+    assert staged_makespan([["a", "b"], ["c", "d"]], durations) == 11.0
+    assert staged_makespan([["a", "b"], ["c", "d"]], durations, max_parallel=1) == 13.0
+
+
+def test_transitive_reduction():
+    """d needs a, b and c, but a and b are already implied by c."""
+    preds = {"a": set(), "b": {"a"}, "c": {"b"}, "d": {"a", "b", "c"}, "e": {"a"}}
+    assert transitive_reduction(preds) == {
+        "a": set(),
+        "b": {"a"},
+        "c": {"b"},
+        "d": {"c"},
+        "e": {"a"},
+    }
+
+
+def test_transitive_reduction_chain():
+    """Every node of a long chain depending on all the previous ones keeps a single need."""
+    names = [f"n{i:04d}" for i in range(2000)]
+    preds = {name: set(names[:i]) for i, name in enumerate(names)}
+    reduced = transitive_reduction(preds)
+    assert all(reduced[name] == {names[i - 1]} for i, name in enumerate(names) if i)
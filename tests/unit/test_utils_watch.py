@@ -0,0 +1,110 @@
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+from conftest import commit_files, git
+
+from git_change_detection.utils.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    WorktreeChanges,
+    blob_id,
+)
+
+
+@pytest.fixture
+def repo_path(git_repo):
+    commit_files(
+        git_repo,
+        {"src/main.py": "main", "src/lib/util.py": "util", ".gitignore": "*.log\n"},
+        "initial",
+    )
+    return git_repo
+
+
+def test_blob_id_matches_git(repo_path):
+    expected = git(repo_path, "hash-object", "src/main.py").stdout.decode().strip()
+    assert blob_id(repo_path / "src" / "main.py") == expected
+
+
+def test_worktree_changes_initial_scan(repo_path):
+    (repo_path / "src" / "main.py").write_text("changed")
+    (repo_path / "new.txt").write_text("new")
+    (repo_path / "debug.log").write_text("ignored")
+
+    changes = WorktreeChanges("HEAD", repo_path)
+
+    assert changes.changed == {"src/main.py", "new.txt"}
+
+
+def test_worktree_changes_refresh(repo_path):
+    changes = WorktreeChanges("HEAD", repo_path)
+    main = repo_path / "src" / "main.py"
+
+    main.write_text("changed")
+    (repo_path / "debug.log").write_text("ignored")
+    assert changes.refresh({"src/main.py", "debug.log"}) == ({"src/main.py"}, set())
+
+    # touched again without going back to the base content
+    main.write_text("changed again")
+    assert changes.refresh({"src/main.py"}) == (set(), set())
+
+    main.write_text("main")
+    assert changes.refresh({"src/main.py"}) == (set(), {"src/main.py"})
+    assert changes.changed == set()
+
+
+def test_worktree_changes_refresh_directories(repo_path):
+    changes = WorktreeChanges("HEAD", repo_path)
+
+    shutil.move(repo_path / "src" / "lib", repo_path / "lib")
+    added, removed = changes.refresh({"src/lib", "lib"})
+
+    assert added == {"src/lib/util.py", "lib/util.py"}
+    assert removed == set()
+
+    shutil.move(repo_path / "lib", repo_path / "src" / "lib")
+    assert changes.refresh({"src/lib", "lib"}) == (set(), {"src/lib/util.py", "lib/util.py"})
+
+
+def test_worktree_changes_invalid_commit(repo_path):
+    with pytest.raises(RuntimeError, match="Commit 'missing' not found"):
+        WorktreeChanges("missing", repo_path)
+
+
+def test_polling_watcher(repo_path):
+    watcher = PollingWatcher(repo_path, interval=0.01)
+
+    (repo_path / "src" / "main.py").write_text("changed, and longer")
+    (repo_path / "src" / "lib" / "util.py").unlink()
+    (repo_path / ".git" / "ignored").write_text("x")
+
+    assert watcher.read() == {"src/main.py", "src/lib/util.py"}
+    assert watcher.read() == set()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher(repo_path):
+    watcher = InotifyWatcher(repo_path)
+
+    def edit():
+        time.sleep(0.05)
+        (repo_path / "src" / "main.py").write_text("changed")
+        (repo_path / "docs").mkdir()
+        (repo_path / "docs" / "index.md").write_text("docs")
+
+    try:
+        thread = threading.Thread(target=edit)
+        thread.start()
+        changed = watcher.read(timeout=5)
+        thread.join()
+        # the new directory is reported (its file too, if created once watched)
+        assert {"src/main.py", "docs"} <= changed <= {"src/main.py", "docs", "docs/index.md"}
+
+        (repo_path / "docs" / "index.md").write_text("changed")
+        assert watcher.read(timeout=5) == {"docs/index.md"}
+        assert watcher.read(timeout=0) == set()
+    finally:
+        watcher.close()